@@ -0,0 +1,474 @@
+import argparse
+from array import array
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from point_in_polygon import (CHUNK_SIZE, INSTRUMENTATION, Point, PointArray, Polygon, PolygonCache, PolygonGrid,
+                               Square, Triangle, TriangleMesh, classify_parallel)
+
+try:
+    # NumPy is optional: it speeds up the point cloud generator and the batch engines
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def generate_star_polygon(vertex_count, seed=0):
+    # Generate a wiggly star-shaped polygon with vertex_count vertices; the random jitter is scaled
+    # to the edge length so, like a real coastline, edges stay short as the vertex count grows
+    rng = random.Random(seed)
+    step = 2 * math.pi / vertex_count
+    points = PointArray()
+    for i in range(vertex_count):
+        angle = i * step
+        radius = 75 + 15 * math.sin(7 * angle) + rng.uniform(-50, 50) * step
+        points.append(Point(radius * math.cos(angle), radius * math.sin(angle)))
+    return points
+
+
+def generate_convex_polygon(vertex_count, seed=0):
+    # Generate a convex polygon with vertex_count vertices at sorted random angles on a circle
+    rng = random.Random(seed)
+    angles = sorted(rng.uniform(0, 2 * math.pi) for _ in range(vertex_count))
+    return PointArray([90 * math.cos(angle) for angle in angles], [90 * math.sin(angle) for angle in angles])
+
+
+def generate_concave_polygon(vertex_count, seed=0):
+    # Generate a comb-shaped concave polygon: a flat base and vertex_count - 2 vertices alternating
+    # between the tips and the roots of randomly deep teeth along the top
+    rng = random.Random(seed)
+    top_count = max(vertex_count - 2, 2)
+    xs = [100 * i / (top_count - 1) for i in range(top_count)]
+    ys = [100.0 if i % 2 == 0 else rng.uniform(20, 80) for i in range(top_count)]
+    return PointArray(xs + [100.0, 0.0], ys + [0.0, 0.0])
+
+
+def generate_triangle_mesh(vertex_count, seed=0):
+    # Generate a mesh of about vertex_count vertices: a square lattice with jittered interior vertices,
+    # every lattice cell split into two triangles
+    rng = random.Random(seed)
+    side = max(2, math.isqrt(vertex_count))
+    xs, ys = [], []
+    for row in range(side):
+        for column in range(side):
+            interior = 0 < row < side - 1 and 0 < column < side - 1
+            xs.append(column + (rng.uniform(-0.3, 0.3) if interior else 0.0))
+            ys.append(row + (rng.uniform(-0.3, 0.3) if interior else 0.0))
+    triangles = []
+    for row in range(side - 1):
+        for column in range(side - 1):
+            corner = row * side + column
+            triangles.append((corner, corner + 1, corner + side + 1))
+            triangles.append((corner, corner + side + 1, corner + side))
+    return xs, ys, triangles
+
+
+def generate_points(count, bounds, seed=0):
+    # Generate count uniformly random points inside the given (min_x, min_y, max_x, max_y) bounds
+    rng = random.Random(seed)
+    min_x, min_y, max_x, max_y = bounds
+    return [Point(rng.uniform(min_x, max_x), rng.uniform(min_y, max_y)) for _ in range(count)]
+
+
+def generate_point_chunks(count, bounds, seed=0, chunk_size=CHUNK_SIZE):
+    # Yield (xs, ys) chunks of count uniformly random points inside the given bounds, so clouds of
+    # 10^8 points never have to sit in memory at once
+    min_x, min_y, max_x, max_y = bounds
+    if np is not None:
+        rng = np.random.default_rng(seed)
+        for start in range(0, count, chunk_size):
+            size = min(chunk_size, count - start)
+            yield rng.uniform(min_x, max_x, size), rng.uniform(min_y, max_y, size)
+        return
+
+    rng = random.Random(seed)
+    for start in range(0, count, chunk_size):
+        size = min(chunk_size, count - start)
+        yield (array('d', [rng.uniform(min_x, max_x) for _ in range(size)]),
+               array('d', [rng.uniform(min_y, max_y) for _ in range(size)]))
+
+
+def time_queries(polygon, points):
+    # Return the mean time per point_in_polygon query in microseconds
+    start = time.perf_counter()
+    for point in points:
+        polygon.point_in_polygon(point)
+    return (time.perf_counter() - start) / len(points) * 1e6
+
+
+def benchmark_slab_index(vertex_counts, query_count, seed=0):
+    # Compare query time against vertex count with and without the slab index
+    print(f"{'vertices':>10} {'build ms':>10} {'scan us':>10} {'indexed us':>11} {'speedup':>8}")
+    for vertex_count in vertex_counts:
+        polygon = Polygon(generate_star_polygon(vertex_count, seed))
+        points = generate_points(query_count, polygon.bounds, seed)
+
+        scan_time = time_queries(polygon, points)
+
+        start = time.perf_counter()
+        polygon.build_index()
+        build_time = (time.perf_counter() - start) * 1e3
+
+        indexed_time = time_queries(polygon, points)
+        print(f"{vertex_count:>10} {build_time:>10.1f} {scan_time:>10.2f} {indexed_time:>11.2f} "
+              f"{scan_time / indexed_time:>7.1f}x")
+
+
+def benchmark_grid(vertex_count, resolutions, query_count, seed=0):
+    # Report build time, memory, hit rate and query time of PolygonGrid at several resolutions
+    polygon = Polygon(generate_star_polygon(vertex_count, seed))
+    polygon.build_index()
+    points = generate_points(query_count, polygon.bounds, seed)
+    print(f"polygon with {vertex_count} vertices, indexed query: {time_queries(polygon, points):.2f} us")
+
+    print(f"{'columns':>8} {'cells':>10} {'build ms':>10} {'hit rate':>9} {'query us':>9}")
+    for columns in resolutions:
+        grid = PolygonGrid(polygon, columns)
+        start = time.perf_counter()
+        for point in points:
+            grid.classify(point)
+        query_time = (time.perf_counter() - start) / len(points) * 1e6
+        stats = grid.stats()
+        print(f"{columns:>8} {stats['cell_bytes']:>10} {stats['build_time'] * 1e3:>10.1f} "
+              f"{stats['hit_rate']:>9.1%} {query_time:>9.2f}")
+
+
+def benchmark_cache(vertex_counts, grid_columns, seed=0):
+    # Compare preparing a polygon (slab index and grid) from scratch with loading it from PolygonCache
+    directory = tempfile.mkdtemp(prefix="pip-cache-")
+    try:
+        print(f"{'vertices':>10} {'build ms':>10} {'cached ms':>10} {'entry KB':>10} {'speedup':>8}")
+        for vertex_count in vertex_counts:
+            vertices = generate_star_polygon(vertex_count, seed)
+            cache = PolygonCache(directory)
+            start = time.perf_counter()
+            cache.prepare(vertices, grid_columns=grid_columns)
+            build_time = time.perf_counter() - start
+            start = time.perf_counter()
+            cache.prepare(vertices, grid_columns=grid_columns)
+            cached_time = time.perf_counter() - start
+            entry_size = os.path.getsize(cache.path_of(vertices))
+            print(f"{vertex_count:>10} {build_time * 1e3:>10.1f} {cached_time * 1e3:>10.1f} "
+                  f"{entry_size / 1024:>10.0f} {build_time / cached_time:>7.1f}x")
+    finally:
+        shutil.rmtree(directory)
+
+
+def benchmark_mesh(vertex_counts, query_count, scan_limit, seed=0):
+    # Compare locating points in a TriangleMesh (one by one and batched) with testing every Triangle
+    print(f"{'triangles':>10} {'build ms':>9} {'locate us':>10} {'batch pts/s':>12} {'scan us':>9}")
+    for vertex_count in vertex_counts:
+        xs, ys, triangles = generate_triangle_mesh(vertex_count, seed)
+        mesh = TriangleMesh(xs, ys, triangles)
+        points = generate_points(query_count, mesh.bounds, seed)
+        point_xs, point_ys = [point.x for point in points], [point.y for point in points]
+
+        start = time.perf_counter()
+        for point in points:
+            mesh.locate(point)
+        locate_time = (time.perf_counter() - start) / query_count
+        start = time.perf_counter()
+        mesh.locate_many(point_xs, point_ys)
+        batch_time = time.perf_counter() - start
+
+        scan = "-"
+        if mesh.count <= scan_limit:
+            shapes = [Triangle([Point(xs[i], ys[i]) for i in triangle]) for triangle in triangles]
+            sample = points[:max(1, query_count // 10)]
+            start = time.perf_counter()
+            for point in sample:
+                next((index for index, shape in enumerate(shapes) if shape.point_in_triangle(point) != "outside"), -1)
+            scan = f"{(time.perf_counter() - start) / len(sample) * 1e6:.1f}"
+        print(f"{mesh.count:>10} {mesh.build_time * 1e3:>9.1f} {locate_time * 1e6:>10.1f} "
+              f"{query_count / batch_time:>12.0f} {scan:>9}")
+
+
+def benchmark_predicates(vertex_counts, query_count, seed=0):
+    # Report how often the boundary test falls back to exact arithmetic, for polygons scaled up (longer
+    # edges) and moved away from the origin. Half of the points are random, the other half are
+    # interpolated on the edges, so they sit within rounding of them: the worst case for the
+    # floating-point filter.
+    print(f"{'vertices':>9} {'scale':>6} {'offset':>8} {'edge tests':>11} {'exact':>7} {'per 1M tests':>13} "
+          f"{'boundary':>9} {'us/point':>9}")
+    rng = random.Random(seed)
+    for vertex_count in vertex_counts:
+        star = generate_star_polygon(vertex_count, seed)
+        for scale, offset in ((1.0, 0.0), (1.0, 1e3), (1.0, 1e6), (1e3, 0.0), (1e6, 0.0), (1e6, 1e9)):
+            polygon = Polygon(PointArray([x * scale + offset for x in star.xs], [y * scale + offset for y in star.ys]))
+            points = generate_points(query_count - query_count // 2, polygon.bounds, seed)
+            for _ in range(query_count // 2):
+                x1, y1, x2, y2 = polygon.edges[rng.randrange(len(polygon.edges))][:4]
+                t = rng.random()
+                points.append(Point(x1 + t * (x2 - x1), y1 + t * (y2 - y1)))
+
+            INSTRUMENTATION.enable()
+            INSTRUMENTATION.reset()
+            start = time.perf_counter()
+            boundary = sum(polygon.point_in_polygon(point) == "boundary" for point in points)
+            elapsed = time.perf_counter() - start
+            counters = INSTRUMENTATION.report()["counters"]
+            INSTRUMENTATION.enable(False)
+            tests, exact = counters.get("edges_visited", 0), counters.get("exact_orientations", 0)
+            per_million = exact / tests * 1e6 if tests else 0
+            print(f"{vertex_count:>9} {scale:>6.0e} {offset:>8.0e} {tests:>11} {exact:>7} {per_million:>13.1f} "
+                  f"{boundary:>9} {elapsed / len(points) * 1e6:>9.1f}")
+
+
+def benchmark_parallel(vertex_count, worker_counts, point_count, seed=0):
+    # Report classify_parallel throughput against the number of worker processes
+    polygon = Polygon(generate_star_polygon(vertex_count, seed))
+    polygon.build_index()
+    points = generate_points(point_count, polygon.bounds, seed)
+    xs, ys = [point.x for point in points], [point.y for point in points]
+    print(f"polygon with {vertex_count} vertices, {point_count} points")
+
+    print(f"{'workers':>8} {'seconds':>9} {'points/s':>12} {'speedup':>8}")
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        classify_parallel(polygon, xs, ys, workers=workers)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>9.3f} {point_count / elapsed:>12.0f} {baseline / elapsed:>7.1f}x")
+
+
+def indexed_polygon(vertices):
+    # Build a polygon with its slab index
+    polygon = Polygon(vertices)
+    polygon.build_index()
+    return polygon
+
+
+# Synthetic polygon generators benchmarked by the suite
+SHAPES = {
+    "convex": generate_convex_polygon,
+    "concave": generate_concave_polygon,
+    "star": generate_star_polygon,
+}
+
+# Engines classifying one Point per call: name -> function building the classifier from the vertices
+POINT_ENGINES = {
+    "point_in_polygon": lambda vertices: Polygon(vertices).point_in_polygon,
+    "mbr_and_rca": lambda vertices: Polygon(vertices).classify_point_using_mbr_and_rca,
+    "slab_index": lambda vertices: indexed_polygon(vertices).point_in_polygon,
+    "grid": lambda vertices: PolygonGrid(indexed_polygon(vertices), 256).classify,
+}
+
+# Engines classifying (xs, ys) arrays per call
+BATCH_ENGINES = {
+    "classify_many": lambda vertices: Polygon(vertices).classify_many,
+    "classify_many_indexed": lambda vertices: indexed_polygon(vertices).classify_many,
+    "grid_many": lambda vertices: PolygonGrid(indexed_polygon(vertices), 256).classify_many,
+    "sweep": lambda vertices: Polygon(vertices).classify_sweep,
+}
+
+# Engines that test every edge for every point; they are skipped above --scan-limit vertices
+SCAN_ENGINES = {"point_in_polygon", "mbr_and_rca", "classify_many"}
+
+# Fixed shapes, benchmarked once: name -> (classifier factory, bounds of the test points)
+FIXED_ENGINES = {
+    "point_in_triangle": (lambda: Triangle.generate_fixed_triangle().point_in_triangle, (1, 1, 7, 7)),
+    "point_in_square": (lambda: Square.generate_fixed_square().point_in_square, (-3, -3, 3, 3)),
+}
+
+
+def percentiles(latencies):
+    # Summarize latencies in nanoseconds as microsecond percentiles
+    latencies = sorted(latencies)
+
+    def at(fraction):
+        return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] / 1e3
+
+    return {"p50": at(0.50), "p90": at(0.90), "p99": at(0.99), "max": latencies[-1] / 1e3}
+
+
+def run_point_engine(factory, point_count, sample, bounds, seed):
+    # Time a per-point engine on up to sample points, one call per point
+    start = time.perf_counter()
+    classify = factory()
+    build_seconds = time.perf_counter() - start
+
+    points = []
+    for xs, ys in generate_point_chunks(min(point_count, sample), bounds, seed):
+        points.extend(map(Point, xs.tolist(), ys.tolist()))
+    latencies = []
+    for point in points:
+        call_start = time.perf_counter_ns()
+        classify(point)
+        latencies.append(time.perf_counter_ns() - call_start)
+
+    # Repeat the build and a short run under tracemalloc, which would distort the timings above
+    tracemalloc.start()
+    classify = factory()
+    for point in points[:1000]:
+        classify(point)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {"kind": "point", "points": len(points), "build_seconds": build_seconds,
+            "throughput": len(points) / (sum(latencies) / 1e9), "latency_us": percentiles(latencies),
+            "latency_unit": "point", "peak_memory_bytes": peak_memory}
+
+
+def run_batch_engine(factory, point_count, bounds, seed):
+    # Time a batch engine on the whole point cloud, one call per chunk
+    start = time.perf_counter()
+    classify = factory()
+    build_seconds = time.perf_counter() - start
+
+    latencies = []
+    first_chunk = None
+    for xs, ys in generate_point_chunks(point_count, bounds, seed):
+        first_chunk = first_chunk or (xs, ys)
+        call_start = time.perf_counter_ns()
+        classify(xs, ys)
+        latencies.append(time.perf_counter_ns() - call_start)
+
+    tracemalloc.start()
+    classify = factory()
+    classify(*first_chunk)
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {"kind": "batch", "points": point_count, "build_seconds": build_seconds,
+            "throughput": point_count / (sum(latencies) / 1e9), "latency_us": percentiles(latencies),
+            "latency_unit": f"chunk of {CHUNK_SIZE}", "peak_memory_bytes": peak_memory}
+
+
+def benchmark_suite(shapes, vertex_counts, engines, point_count, sample, scan_limit, seed=0):
+    # Run every engine on every synthetic polygon and return the results as a JSON-ready dict
+    results = []
+
+    def record(shape, vertex_count, engine, run):
+        print(f"{shape:>8} {vertex_count:>8} {engine:>22}", end=" ", file=sys.stderr, flush=True)
+        if shape != "fixed" and engine in SCAN_ENGINES and vertex_count > scan_limit:
+            result = {"skipped": f"more than {scan_limit} vertices"}
+        else:
+            result = run()
+        print(result.get("skipped") or f"{result['throughput']:,.0f} points/s", file=sys.stderr)
+        results.append(dict({"shape": shape, "vertices": vertex_count, "engine": engine}, **result))
+
+    for shape in shapes:
+        for vertex_count in vertex_counts:
+            vertices = SHAPES[shape](vertex_count, seed)
+            bounds = Polygon(vertices).bounds
+            for engine in engines:
+                if engine in POINT_ENGINES:
+                    record(shape, vertex_count, engine, lambda: run_point_engine(
+                        lambda: POINT_ENGINES[engine](vertices), point_count, sample, bounds, seed))
+                elif engine in BATCH_ENGINES and np is not None:
+                    record(shape, vertex_count, engine, lambda: run_batch_engine(
+                        lambda: BATCH_ENGINES[engine](vertices), point_count, bounds, seed))
+
+    for engine in engines:
+        if engine in FIXED_ENGINES:
+            factory, bounds = FIXED_ENGINES[engine]
+            record("fixed", 3 if engine == "point_in_triangle" else 4, engine,
+                   lambda: run_point_engine(factory, point_count, sample, bounds, seed))
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__ if np is not None else None,
+        "platform": platform.platform(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": seed,
+        "results": results,
+    }
+
+
+def find_regressions(report, baseline, threshold):
+    # Compare the throughput of every engine with a baseline report; return the descriptions of the
+    # ones that slowed down by more than threshold (a fraction)
+    previous = {(result["shape"], result["vertices"], result["engine"]): result
+                for result in baseline["results"] if "throughput" in result}
+    regressions = []
+    for result in report["results"]:
+        old = previous.get((result["shape"], result["vertices"], result["engine"]))
+        if old is None or "throughput" not in result:
+            continue
+        change = result["throughput"] / old["throughput"] - 1
+        if change < -threshold:
+            regressions.append(f"{result['engine']} on {result['shape']} with {result['vertices']} vertices: "
+                               f"{old['throughput']:,.0f} -> {result['throughput']:,.0f} points/s ({change:+.0%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the point-in-polygon classifiers.")
+    parser.add_argument("--mode", choices=["slab", "grid", "parallel", "cache", "mesh", "predicates", "suite"],
+                        default="slab",
+                        help="suite: every engine on synthetic polygons, reported as JSON; "
+                             "slab: query time against vertex count with and without the slab index; "
+                             "grid: PolygonGrid hit rate and build time against resolution; "
+                             "parallel: classify_parallel throughput against worker count; "
+                             "cache: building against loading a prepared polygon from PolygonCache; "
+                             "mesh: TriangleMesh point location against testing every triangle; "
+                             "predicates: how often the boundary test needs exact arithmetic")
+    parser.add_argument("--vertices", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000],
+                        help="polygon sizes to benchmark (grid mode uses the first)")
+    parser.add_argument("--resolutions", type=int, nargs="+", default=[16, 64, 256, 1024],
+                        help="grid columns to benchmark in grid mode (cache mode uses the last)")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, 8, os.cpu_count() or 1}),
+                        help="worker counts to benchmark in parallel mode")
+    parser.add_argument("--queries", type=int, default=1000, help="number of query points per size")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    suite = parser.add_argument_group("suite mode")
+    suite.add_argument("--shapes", nargs="+", choices=list(SHAPES), default=list(SHAPES),
+                       help="synthetic polygon shapes")
+    engine_names = list(POINT_ENGINES) + list(BATCH_ENGINES) + list(FIXED_ENGINES)
+    suite.add_argument("--engines", nargs="+", choices=engine_names, default=engine_names,
+                       help="classifiers to benchmark")
+    suite.add_argument("--points", type=int, default=100000,
+                       help="points in the cloud classified by the batch engines")
+    suite.add_argument("--sample", type=int, default=2000,
+                       help="maximum number of points classified one by one by the per-point engines")
+    suite.add_argument("--scan-limit", type=int, default=10000,
+                       help="skip the engines that scan every edge above this many vertices "
+                            "(in mesh mode: the triangle scan above this many triangles)")
+    suite.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    suite.add_argument("--compare", help="baseline JSON report to check for throughput regressions")
+    suite.add_argument("--threshold", type=float, default=0.2,
+                       help="throughput drop (as a fraction) reported as a regression")
+    args = parser.parse_args()
+
+    if args.mode == "suite":
+        report = benchmark_suite(args.shapes, args.vertices, args.engines, args.points, args.sample,
+                                 args.scan_limit, args.seed)
+        if args.output:
+            with open(args.output, 'w') as file:
+                json.dump(report, file, indent=2)
+        else:
+            print(json.dumps(report, indent=2))
+
+        if args.compare:
+            with open(args.compare, 'r') as file:
+                regressions = find_regressions(report, json.load(file), args.threshold)
+            for regression in regressions:
+                print(f"Regression: {regression}", file=sys.stderr)
+            if regressions:
+                sys.exit(1)
+    elif args.mode == "parallel":
+        benchmark_parallel(args.vertices[0], args.workers, args.queries, args.seed)
+    elif args.mode == "cache":
+        benchmark_cache(args.vertices, args.resolutions[-1], args.seed)
+    elif args.mode == "predicates":
+        benchmark_predicates(args.vertices, args.queries, args.seed)
+    elif args.mode == "mesh":
+        benchmark_mesh(args.vertices, args.queries, args.scan_limit, args.seed)
+    elif args.mode == "grid":
+        benchmark_grid(args.vertices[0], args.resolutions, args.queries, args.seed)
+    else:
+        benchmark_slab_index(args.vertices, args.queries, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+import argparse
+import asyncio
+from collections import deque
+import json
+from urllib.parse import parse_qs, urlsplit
+
+from point_in_polygon import Geometry, Polygon, numpy, read_coordinates_from_file
+
+
+class MicroBatcher:
+    # Coalesces the queries of concurrent requests into one Polygon.classify_many call. A batch starts
+    # as soon as the event loop has handled the other ready connections, so a lone query is not held
+    # back; every query that arrived in the meantime (up to max_points points) joins it.
+    def __init__(self, polygon, max_points=4096, max_delay=0.0):
+        self.polygon = polygon
+        self.max_points = max_points
+        self.max_delay = max_delay  # Extra seconds to wait for more queries before each batch
+        self.pending = deque()  # (xs, ys, future) of the queries waiting for a batch
+        self.wakeup = asyncio.Event()
+        self.queries = 0
+        self.points = 0
+        self.batches = 0
+
+    async def classify(self, xs, ys):
+        # Queue the points of one query and wait for their categories
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((xs, ys, future))
+        self.wakeup.set()
+        return await future
+
+    async def run(self):
+        # Classify the queued queries batch by batch until cancelled
+        while True:
+            await self.wakeup.wait()
+            # Yield once so the queries of the other ready connections are queued too
+            await asyncio.sleep(self.max_delay)
+            self.wakeup.clear()
+
+            batch = []
+            xs, ys = [], []
+            while self.pending and (not batch or len(xs) + len(self.pending[0][0]) <= self.max_points):
+                query = self.pending.popleft()
+                batch.append(query)
+                xs.extend(query[0])
+                ys.extend(query[1])
+            if self.pending:
+                self.wakeup.set()
+
+            try:
+                codes = self.polygon.classify_many(xs, ys)
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            start = 0
+            for query_xs, _, future in batch:
+                if not future.done():
+                    future.set_result([Geometry.CATEGORIES[code] for code in codes[start:start + len(query_xs)]])
+                start += len(query_xs)
+            self.queries += len(batch)
+            self.points += len(xs)
+            self.batches += 1
+
+    def stats(self):
+        # Report the number of queries, points and batches classified so far
+        return {
+            "queries": self.queries,
+            "points": self.points,
+            "batches": self.batches,
+            "mean_batch_points": self.points / self.batches if self.batches else 0.0,
+        }
+
+
+class ClassificationServer:
+    # Minimal HTTP/1.1 server (keep-alive, JSON responses) answering point queries against one polygon:
+    #   GET  /classify?x=1.5&y=2       -> {"category": "inside"}
+    #   POST /classify {"points": [[1.5, 2], [7, 0]]}  -> {"categories": ["inside", "outside"]}
+    #   GET  /stats                    -> polygon bounds and batching counters
+    def __init__(self, polygon, max_points=4096, max_delay=0.0):
+        self.polygon = polygon
+        self.batcher = MicroBatcher(polygon, max_points, max_delay)
+
+    async def serve(self, host, port):
+        # Accept connections until cancelled
+        batching = asyncio.create_task(self.batcher.run())
+        server = await asyncio.start_server(self.handle, host, port)
+        try:
+            address = server.sockets[0].getsockname()
+            print(f"Serving {len(self.polygon.edges)}-edge polygon on http://{address[0]}:{address[1]}")
+            async with server:
+                await server.serve_forever()
+        finally:
+            batching.cancel()
+
+    async def handle(self, reader, writer):
+        # Answer the requests of one connection until the client closes it
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if not line.strip():
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+                status, payload = await self.respond(method, target, body)
+                data = json.dumps(payload).encode()
+                writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                             f"Content-Length: {len(data)}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            # Drop connections that break off or do not speak HTTP
+            print(f"Error in ClassificationServer.handle: {e}")
+        finally:
+            writer.close()
+
+    async def respond(self, method, target, body):
+        # Return the status line and JSON payload of one request
+        url = urlsplit(target)
+        try:
+            if url.path == '/classify' and method == 'GET':
+                query = parse_qs(url.query)
+                categories = await self.batcher.classify([float(query['x'][0])], [float(query['y'][0])])
+                return "200 OK", {"category": categories[0]}
+            if url.path == '/classify' and method == 'POST':
+                points = json.loads(body)["points"]
+                xs = [float(x) for x, _ in points]
+                ys = [float(y) for _, y in points]
+                return "200 OK", {"categories": await self.batcher.classify(xs, ys)}
+            if url.path == '/stats' and method == 'GET':
+                return "200 OK", dict(self.batcher.stats(), bounds=self.polygon.bounds)
+        except (KeyError, TypeError, ValueError) as e:
+            return "400 Bad Request", {"error": f"invalid query: {e}"}
+        return "404 Not Found", {"error": f"no route for {method} {url.path}"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve point-in-polygon queries against polygon.csv over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="port to listen on")
+    parser.add_argument("--polygon", default="polygon.csv", help="polygon CSV file (id,x,y)")
+    parser.add_argument("--max-batch", type=int, default=4096,
+                        help="maximum number of points classified in one batch")
+    parser.add_argument("--max-delay", type=float, default=0.0,
+                        help="seconds to wait for more queries before each batch")
+    args = parser.parse_args()
+
+    polygon_coordinates = read_coordinates_from_file(args.polygon)
+    if not polygon_coordinates:
+        print("Error: Empty polygon coordinates.")
+        return
+    polygon = Polygon(polygon_coordinates)
+    polygon.build_index()
+    # Import NumPy before listening, so the first batch does not wait for it
+    numpy()
+
+    try:
+        asyncio.run(ClassificationServer(polygon, args.max_batch, args.max_delay).serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
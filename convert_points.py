@@ -0,0 +1,25 @@
+import argparse
+
+from point_in_polygon import convert_binary_to_csv, convert_csv_to_binary, is_binary_file
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert between CSV point/result files (input.csv, output.csv) and the binary "
+                    "columnar format. The direction is taken from the source file.")
+    parser.add_argument("source", help="CSV or binary file to convert")
+    parser.add_argument("destination", help="file to write")
+    args = parser.parse_args()
+
+    try:
+        if is_binary_file(args.source):
+            count = convert_binary_to_csv(args.source, args.destination)
+        else:
+            count = convert_csv_to_binary(args.source, args.destination)
+        print(f"Converted {count} rows from {args.source} to {args.destination}.")
+    except (FileNotFoundError, ValueError) as e:
+        print(f"Error converting {args.source}: {e}")
+
+
+if __name__ == "__main__":
+    main()
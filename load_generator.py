@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmark import percentiles
+
+
+async def request(reader, writer, method, target, payload=None):
+    # Send one HTTP/1.1 request on a keep-alive connection and return the decoded JSON response
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {target} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+
+    status = await reader.readline()
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if not line.strip():
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    data = await reader.readexactly(int(headers.get('content-length', 0)))
+    if not status.startswith(b"HTTP/1.1 200"):
+        raise ValueError(f"{status.decode().strip()}: {data.decode()}")
+    return json.loads(data)
+
+
+async def run_client(host, port, requests, batch, bounds, seed, latencies):
+    # Send requests one after the other on one connection, recording each round trip in nanoseconds
+    rng = random.Random(seed)
+    min_x, min_y, max_x, max_y = bounds
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(requests):
+            points = [[rng.uniform(min_x, max_x), rng.uniform(min_y, max_y)] for _ in range(batch)]
+            start = time.perf_counter_ns()
+            if batch == 1:
+                await request(reader, writer, "GET", f"/classify?x={points[0][0]!r}&y={points[0][1]!r}")
+            else:
+                await request(reader, writer, "POST", "/classify", {"points": points})
+            latencies.append(time.perf_counter_ns() - start)
+    finally:
+        writer.close()
+
+
+async def generate_load(host, port, connections, requests, batch, seed=0):
+    # Run concurrent clients against a classification server and report throughput and latency
+    reader, writer = await asyncio.open_connection(host, port)
+    before = await request(reader, writer, "GET", "/stats")
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(host, port, requests, batch, before["bounds"], seed + client, latencies)
+                           for client in range(connections)))
+    elapsed = time.perf_counter() - start
+    after = await request(reader, writer, "GET", "/stats")
+    writer.close()
+
+    batches = after["batches"] - before["batches"]
+    return {
+        "connections": connections,
+        "requests": len(latencies),
+        "points": len(latencies) * batch,
+        "requests_per_second": len(latencies) / elapsed,
+        "points_per_second": len(latencies) * batch / elapsed,
+        "latency_us": percentiles(latencies),
+        "server_batches": batches,
+        "mean_batch_points": (after["points"] - before["points"]) / batches if batches else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the throughput and latency of classify_server.py.")
+    parser.add_argument("--host", default="127.0.0.1", help="server address")
+    parser.add_argument("--port", type=int, default=8080, help="server port")
+    parser.add_argument("--connections", type=int, default=16, help="concurrent client connections")
+    parser.add_argument("--requests", type=int, default=1000, help="requests sent by each connection")
+    parser.add_argument("--batch", type=int, default=1,
+                        help="points per request (1 sends GET queries, more send POST batches)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    try:
+        report = asyncio.run(generate_load(args.host, args.port, args.connections, args.requests, args.batch,
+                                           args.seed))
+    except (ConnectionError, ValueError) as e:
+        print(f"Error in load_generator: {e}")
+        return
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
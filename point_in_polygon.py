@@ -0,0 +1,2748 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from fractions import Fraction
+import hashlib
+import itertools
+import json
+import math
+import mmap
+import multiprocessing
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+
+class _DeferredNumPy:
+    # Stands in for the numpy module until the first batch path needs it (see numpy): any attribute
+    # access imports it
+    def __getattr__(self, name):
+        module = numpy()
+        if module is None:
+            raise ImportError("NumPy is not installed")
+        return getattr(module, name)
+
+# NumPy is optional: it is only used to speed up batch classification. It is imported on first use,
+# so importing this module and classifying single points never pay for its start-up time.
+np = _DeferredNumPy()
+
+def numpy():
+    # Import NumPy on first use and return it, or None when it is not installed
+    global np
+    if isinstance(np, _DeferredNumPy):
+        try:
+            import numpy as module
+        except ImportError:
+            module = None
+        np = module
+    return np
+
+class Instrumentation:
+    # Opt-in stage timers and counters for the classification pipeline. While disabled, stage()
+    # returns a shared no-op context and the hot paths skip their counting after one attribute check,
+    # so leaving the calls in costs next to nothing.
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+
+    def enable(self, enabled=True):
+        # Start (or stop) recording
+        self.enabled = enabled
+
+    def reset(self):
+        # Forget everything recorded so far
+        self.stages = {}  # Stage name -> [calls, seconds, items]
+        self.counters = {}
+
+    def count(self, name, amount=1):
+        # Add amount to a named counter; callers check self.enabled first on hot paths
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def stage(self, name, items=0):
+        # Return a context manager timing one run of a pipeline stage over items items (points, rows,
+        # ...); the count can also be set later through its items attribute
+        if not self.enabled:
+            return _NO_STAGE
+        return _Stage(self, name, items)
+
+    def report(self):
+        # Return the stage timings, counters and derived rates as a JSON-ready dict
+        stages = {}
+        for name, (calls, seconds, items) in self.stages.items():
+            stages[name] = {"calls": calls, "seconds": seconds, "items": items,
+                            "items_per_second": items / seconds if items and seconds > 0 else None}
+        counters = dict(self.counters)
+        mbr_tests, points = counters.get("mbr_tests", 0), counters.get("points", 0)
+        rates = {
+            "mbr_reject_rate": counters.get("mbr_rejects", 0) / mbr_tests if mbr_tests else None,
+            "edges_per_point": counters.get("edges_visited", 0) / points if points else None,
+            "boundary_rate": counters.get("boundary", 0) / points if points else None,
+        }
+        return {"stages": stages, "counters": counters, "rates": rates}
+
+    def dump(self, filename="-"):
+        # Write the report as JSON to a file, or to stdout for "-"
+        text = json.dumps(self.report(), indent=2)
+        if filename == "-":
+            print(text)
+        else:
+            with open(filename, 'w') as file:
+                file.write(text + "\n")
+
+class _Stage:
+    # Context manager adding its wall time to an Instrumentation stage
+    def __init__(self, instrumentation, name, items):
+        self.instrumentation = instrumentation
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        record = self.instrumentation.stages.setdefault(self.name, [0, 0.0, 0])
+        record[0] += 1
+        record[1] += time.perf_counter() - self.start
+        record[2] += self.items
+
+class _NoStage:
+    # Stand-in for _Stage while instrumentation is disabled
+    items = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+_NO_STAGE = _NoStage()
+
+# Instrumentation shared by the whole pipeline; enable it with INSTRUMENTATION.enable()
+INSTRUMENTATION = Instrumentation()
+
+# The Geometry class contains common geometric operations and constants
+class Geometry:
+    # Tolerance value for geometric calculations
+    TOLERANCE = 1e-10
+
+    # Compact category codes returned by the batch classifiers
+    OUTSIDE, INSIDE, BOUNDARY = 0, 1, 2
+    CATEGORIES = ("outside", "inside", "boundary")
+
+    # Error bound of a determinant a * b - c * d of rounded coordinate differences evaluated in floating
+    # point (Shewchuk's ccwerrboundA): its sign is certain once its magnitude exceeds this times
+    # |a * b| + |c * d|
+    ORIENTATION_ERROR = (3 + 16 * 2.0 ** -53) * 2.0 ** -53
+
+    # Static method to calculate the Euclidean distance between two points
+    @staticmethod
+    def distance(point1, point2):
+        return ((point1.x - point2.x) ** 2 + (point1.y - point2.y) ** 2) ** 0.5
+
+    # Static method to check if a point lies on a given line segment
+    @staticmethod
+    def on_line(point, line):
+        x, y = point.x, point.y
+        x1, y1, x2, y2 = line
+        if INSTRUMENTATION.enabled:
+            INSTRUMENTATION.count("on_line_calls")
+
+        # Check if the point coincides with either endpoint of the line
+        if abs(x - x1) < Geometry.TOLERANCE and abs(y - y1) < Geometry.TOLERANCE:
+            return True
+        if abs(x - x2) < Geometry.TOLERANCE and abs(y - y2) < Geometry.TOLERANCE:
+            return True
+
+        # Check if the point is within a certain tolerance of the line
+        if (x1 <= x <= x2 or x2 <= x <= x1) and (y1 <= y <= y2 or y2 <= y <= y1):
+            # Compare the squared perpendicular distance, so no square root is needed
+            cross = (x2 - x1) * (y1 - y) - (x1 - x) * (y2 - y1)
+            if cross * cross < Geometry.TOLERANCE ** 2 * ((x2 - x1) ** 2 + (y2 - y1) ** 2):
+                return True
+            # Rounding can hide a point exactly on a long or far away segment
+            return Geometry.side_of_line(x1, y1, x2, y2, x, y) == 0
+
+        return False
+
+    @staticmethod
+    def side_of_line(ax, ay, bx, by, cx, cy):
+        # Return 1 if c is left of the line from a to b, -1 if it is right of it and 0 if the three
+        # points are collinear. The floating-point determinant decides whenever its sign is certain;
+        # only determinants within the error bound are recomputed exactly.
+        left = (bx - ax) * (cy - ay)
+        right = (by - ay) * (cx - ax)
+        determinant = left - right
+        if left > 0 and right > 0 or left < 0 and right < 0:
+            if abs(determinant) <= Geometry.ORIENTATION_ERROR * (abs(left) + abs(right)):
+                return Geometry.exact_orientation(ax, ay, bx, by, cx, cy)
+        # Products of opposite signs (or a zero product) cannot cancel, so the sign is exact
+        return (determinant > 0) - (determinant < 0)
+
+    @staticmethod
+    def exact_orientation(ax, ay, bx, by, cx, cy):
+        # Exact version of side_of_line in rational arithmetic, for the rare near-collinear cases
+        if INSTRUMENTATION.enabled:
+            INSTRUMENTATION.count("exact_orientations")
+        ax, ay, bx, by, cx, cy = map(Fraction, (ax, ay, bx, by, cx, cy))
+        determinant = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+        return (determinant > 0) - (determinant < 0)
+
+class Point:
+    # Represents a point in 2D space
+    # Slots keep every point to two attributes without a per-instance __dict__
+    __slots__ = ("x", "y")
+
+    def __init__(self, x, y):
+        # Initialize a point with x and y coordinates
+        self.x = x
+        self.y = y
+
+class PointArray:
+    # Compact sequence of 2D points stored as two contiguous float64 buffers (16 bytes per point).
+    # Indexing returns a Point copy, slicing returns a PointArray and iterating yields Points, so it can
+    # be used wherever a list of Points is expected.
+    __slots__ = ("xs", "ys")
+
+    def __init__(self, xs=(), ys=()):
+        # Initialize from sequences of x and y coordinates
+        self.xs = array('d', xs)
+        self.ys = array('d', ys)
+        if len(self.xs) != len(self.ys):
+            raise ValueError("xs and ys must have the same length")
+
+    @staticmethod
+    def from_points(points):
+        # Create a PointArray from an iterable of Points
+        point_array = PointArray()
+        for point in points:
+            point_array.append(point)
+        return point_array
+
+    def append(self, point):
+        # Add a point at the end
+        self.xs.append(point.x)
+        self.ys.append(point.y)
+
+    def __len__(self):
+        return len(self.xs)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return PointArray(self.xs[index], self.ys[index])
+        return Point(self.xs[index], self.ys[index])
+
+    def __setitem__(self, index, point):
+        self.xs[index] = point.x
+        self.ys[index] = point.y
+
+    def __delitem__(self, index):
+        del self.xs[index]
+        del self.ys[index]
+
+    def insert(self, index, point):
+        # Insert a point before position index
+        self.xs.insert(index, point.x)
+        self.ys.insert(index, point.y)
+
+    def __iter__(self):
+        return map(Point, self.xs, self.ys)
+
+    def __add__(self, other):
+        # Concatenate with another PointArray or a list of Points
+        if not isinstance(other, PointArray):
+            other = PointArray.from_points(other)
+        return PointArray(self.xs + other.xs, self.ys + other.ys)
+
+def coordinates_of(points):
+    # Return the x and y coordinates of a PointArray or a sequence of Points as two sequences
+    if isinstance(points, PointArray):
+        return points.xs, points.ys
+    return [point.x for point in points], [point.y for point in points]
+
+def group_pairs(offsets, item_ids, groups, candidates, batch_cells):
+    # Pair every candidate with the items of its group in a list of groups stored as NumPy offsets
+    # and item ids (group g owns item_ids[offsets[g]:offsets[g + 1]]), where groups[i] is the group of
+    # candidates[i]. Yields (index, owner, ids) chunks of about batch_cells pairs: pair k pairs
+    # candidate index[owner[k]] with item ids[k], and the pairs of a candidate stay together in order.
+    return range_pairs(offsets[groups], offsets[groups + 1], item_ids, candidates, batch_cells)
+
+def range_pairs(starts, stops, item_ids, candidates, batch_cells):
+    # Pair every candidate with a run of item ids, item_ids[starts[i]:stops[i]] for candidates[i].
+    # Yields (index, owner, ids) chunks like group_pairs.
+    sizes = stops - starts
+    cumulative = np.cumsum(sizes)
+    total = int(cumulative[-1]) if len(cumulative) else 0
+    splits = np.searchsorted(cumulative, np.arange(batch_cells, total, batch_cells), side='right')
+    for start, stop in zip(np.concatenate(([0], splits)), np.concatenate((splits, [len(candidates)]))):
+        if start == stop:
+            continue
+        chunk_sizes = sizes[start:stop]
+        owner = np.repeat(np.arange(stop - start), chunk_sizes)
+        # Position of each pair inside its run, added to the run's first item
+        first = np.cumsum(chunk_sizes) - chunk_sizes
+        within = np.arange(len(owner)) - first[owner]
+        yield candidates[start:stop], owner, item_ids[starts[start:stop][owner] + within]
+
+class Polygon(Geometry):
+    def __init__(self, points, holes=None):
+        # Initialize a polygon with a list of points and optional holes (interior rings, each a list
+        # of points)
+        self.slab_count = None  # Number of slabs in the optional edge index (see build_index)
+        self.holes = list(holes) if holes else []
+        # Assigning the points also builds the cached MBR and edge data
+        self.points = points
+
+    @property
+    def points(self):
+        # Vertices of the polygon
+        return self._points
+
+    @points.setter
+    def points(self, points):
+        # Replace the vertices and rebuild the cached MBR and edge data
+        self._points = points
+        self.refresh()
+
+    @classmethod
+    def from_prepared(cls, points, edges, orientation, convex, slab_count=None, slab_offsets=None,
+                      slab_edge_ids=None):
+        # Create a polygon from edge and slab index data prepared earlier for the same vertices (see
+        # PolygonCache) instead of rebuilding it
+        polygon = cls.__new__(cls)
+        polygon.slab_count = None
+        polygon.holes = []
+        polygon._points = points
+        polygon.refresh(edges, orientation, convex)
+        if slab_count:
+            polygon.restore_index(slab_count, slab_offsets, slab_edge_ids)
+        return polygon
+
+    def rings(self):
+        # Return the rings whose edges bound the polygon: the outer ring, then the holes
+        return [self._points] + self.holes
+
+    @property
+    def parts(self):
+        # Polygons making up the shape (see MultiPolygon)
+        return [self]
+
+    def refresh(self, edges=None, orientation=None, convex=None):
+        # Rebuild the cached MBR and edge data; call this after editing self.points in place.
+        # Prepared edges, orientation and convexity of the same vertices can be passed in to skip
+        # recomputing them.
+        self.mbr = None  # Minimum Bounding Rectangle (MBR) for the polygon
+        self.bounds = None  # MBR as a (min_x, min_y, max_x, max_y) tuple
+        self.edges = []
+        self.slabs = None  # Edge lists of the slab index, one per slab
+        self.orientation = 0  # 1 for counter-clockwise vertices, -1 for clockwise, 0 if degenerate
+        self.convex = False  # Whether the convex fast path is used (see detect_convexity)
+        self.chains = None  # Edge chains of the convex fast path (see build_chains)
+        self._edge_arrays = None  # NumPy copy of the edges, built on first use by classify_many
+        self._slab_arrays = None  # NumPy copy of the slab index, built on first use by classify_many
+        self._chain_arrays = None  # NumPy copy of the chains, built on first use by classify_many
+        if not self._points:
+            return
+
+        self.mbr = self.create_mbr()
+        self.bounds = (self.mbr[0].x, self.mbr[0].y, self.mbr[2].x, self.mbr[2].y)
+
+        # Each edge is stored as (x1, y1, x2, y2, y_min, y_max, slope, length), where slope is
+        # dx / dy (0 for horizontal edges, which are never crossed) and length feeds the distance test.
+        # The edges of all the rings share one list, so one crossing count per point applies the
+        # even-odd rule across outer rings and holes alike.
+        rings = self.rings()
+        if edges is not None:
+            self.edges = edges
+        else:
+            for ring in rings:
+                xs, ys = coordinates_of(ring)
+                n = len(xs)
+                for i in range(n):
+                    x1, y1 = xs[i], ys[i]
+                    x2, y2 = xs[(i + 1) % n], ys[(i + 1) % n]
+                    slope = (x2 - x1) / (y2 - y1) if y1 != y2 else 0.0
+                    length = ((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5
+                    self.edges.append((x1, y1, x2, y2, min(y1, y2), max(y1, y2), slope, length))
+
+        xs, ys = coordinates_of(rings[0])
+        if convex is False:
+            # Known not to be convex, so there are no chains to build
+            self.orientation = orientation
+        elif convex and len(rings) == 1:
+            # Known to be convex, so only the chains need building
+            self.orientation = orientation
+            self.build_chains(ys)
+        elif len(rings) > 1:
+            # Holes and multiple parts always take the edge scan
+            self.orientation = self.ring_orientation(xs, ys)
+        else:
+            self.detect_convexity(xs, ys)
+
+        # Keep the slab index in step with the edges once it has been requested
+        if self.slab_count:
+            self.build_index(self.slab_count)
+
+    def move_vertex(self, index, point):
+        # Move vertex index to point and rebuild the cached data. Returns the box outside which no
+        # classification can have changed (see edit_bounds).
+        bounds = self.edit_bounds((index - 1, index, index + 1), [point])
+        self._points[index] = point
+        self.refresh()
+        return bounds
+
+    def insert_vertex(self, index, point):
+        # Insert a vertex before vertex index, splitting the edge from vertex index - 1, and rebuild
+        # the cached data. Returns the box outside which no classification can have changed.
+        bounds = self.edit_bounds((index - 1, index), [point])
+        self._points.insert(index, point)
+        self.refresh()
+        return bounds
+
+    def delete_vertex(self, index):
+        # Delete vertex index, joining its neighbours by one edge, and rebuild the cached data.
+        # Returns the box outside which no classification can have changed.
+        bounds = self.edit_bounds((index - 1, index, index + 1), [])
+        del self._points[index]
+        self.refresh()
+        return bounds
+
+    def edit_bounds(self, indices, new_points):
+        # Return the (min_x, min_y, max_x, max_y) box around the vertices at indices (taken around the
+        # ring) and new_points, widened by the tolerance margin. An edit only replaces the edges between
+        # these vertices, so the points whose classification changes lie between the old and the new
+        # edges: inside the convex hull of these vertices, and so inside the box. The separate MBRs of
+        # the edges would not do, as they can miss the area swept between the edges.
+        n = len(self._points)
+        vertices = [self._points[i % n] for i in indices] if n else []
+        vertices += new_points
+        margin = 2 * Geometry.TOLERANCE
+        return (min(point.x for point in vertices) - margin, min(point.y for point in vertices) - margin,
+                max(point.x for point in vertices) + margin, max(point.y for point in vertices) + margin)
+
+    @staticmethod
+    def ring_orientation(xs, ys):
+        # Return 1 for a counter-clockwise ring, -1 for a clockwise one and 0 if it has no area
+        area = 0.0
+        n = len(xs)
+        for i in range(n):
+            area += xs[i] * ys[(i + 1) % n] - xs[(i + 1) % n] * ys[i]
+        return (area > 0) - (area < 0)
+
+    def detect_convexity(self, xs, ys):
+        # Work out the orientation of the vertices and whether the polygon is convex. Convex polygons
+        # get the two edge chains of build_chains, which point_in_polygon searches in O(log n).
+        self.orientation = self.ring_orientation(xs, ys)
+
+        fan = self.fan_vertices(xs, ys)
+        if len(fan) < 3:
+            return
+
+        # Every turn must go the same way and the turns must add up to exactly one full turn
+        turning = 0.0
+        sign = 0
+        for i, (x, y) in enumerate(fan):
+            (x0, y0), (x2, y2) = fan[i - 1], fan[(i + 1) % len(fan)]
+            cross = (x - x0) * (y2 - y) - (y - y0) * (x2 - x)
+            # A nearly collinear vertex may turn the other way in exact arithmetic, so leave such
+            # polygons to the edge scan
+            length = math.hypot(x - x0, y - y0) + math.hypot(x2 - x, y2 - y)
+            if abs(cross) <= Geometry.TOLERANCE * length or sign and (cross > 0) != (sign > 0):
+                return
+            sign = 1 if cross > 0 else -1
+            turning += math.atan2(cross, (x - x0) * (x2 - x) + (y - y0) * (y2 - y))
+        if abs(abs(turning) - 2 * math.pi) > 1e-6:
+            return
+        self.build_chains(ys)
+
+    @staticmethod
+    def fan_vertices(xs, ys):
+        # Return the vertices (x, y) without repeats, including a closing copy of the first vertex
+        return [(x, y) for i, (x, y) in enumerate(zip(xs, ys)) if (x, y) != (xs[i - 1], ys[i - 1])]
+
+    def build_chains(self, ys):
+        # Split the edges of a convex ring at its lowest and highest vertices into two chains along
+        # which y never decreases (the falling chain is reversed), each with the y_min and y_max of
+        # its edges for binary searches and the positions of its edges in self.edges. The edges keep their direction, so the chains give exactly
+        # the boundary and crossing tests of the edge scan. Rings that are not monotone after all
+        # (rounding in the convexity test) stay on the edge scan.
+        n = len(ys)
+        bottom = min(range(n), key=ys.__getitem__)
+        top = max(range(n), key=ys.__getitem__)
+        rising = [(bottom + k) % n for k in range((top - bottom) % n)]
+        falling = [(top + k) % n for k in range((bottom - top) % n)][::-1]
+        chains = []
+        for edge_ids in (rising, falling):
+            edges = [self.edges[i] for i in edge_ids]
+            lows = [edge[4] for edge in edges]
+            highs = [edge[5] for edge in edges]
+            if any(lows[k] > lows[k + 1] or highs[k] > highs[k + 1] for k in range(len(edges) - 1)):
+                return
+            chains.append((edges, lows, highs, edge_ids))
+        self.convex = True
+        self.chains = chains
+
+    # Upper bound on the average number of slabs an edge is listed in by the default slab index
+    SLAB_ENTRIES_PER_EDGE = 8
+
+    def build_index(self, slab_count=None):
+        # Build the slab index: the MBR is cut into horizontal slabs and each slab lists the edges
+        # whose y-range reaches it, so a query only scans the edges near its scanline.
+        # By default there is one slab per edge, reduced when tall edges would make the index hold
+        # more than SLAB_ENTRIES_PER_EDGE entries per edge.
+        self._slab_arrays = None
+        if not self.edges:
+            self.slab_count = slab_count or 1
+            self.slabs = None
+            return
+
+        height = self.bounds[3] - self.bounds[1]
+        if not slab_count:
+            slab_count = len(self.edges)
+            edge_heights = sum(edge[5] - edge[4] for edge in self.edges)
+            if edge_heights > 0:
+                # An edge spans about edge height / slab height slabs, plus the one it starts in
+                budget = (self.SLAB_ENTRIES_PER_EDGE - 1) * len(self.edges) * height / edge_heights
+                slab_count = max(1, min(slab_count, int(budget)))
+        self.slab_count = slab_count
+        self._slab_scale = self.slab_count / height if height > 0 else 0.0
+        # Widen every edge by the same margin point_in_polygon uses to skip edges
+        margin = 2 * Geometry.TOLERANCE
+        self.slabs = [[] for _ in range(self.slab_count)]
+        self._slab_edge_ids = [[] for _ in range(self.slab_count)]
+        for i, edge in enumerate(self.edges):
+            for slab in range(self.slab_of(edge[4] - margin), self.slab_of(edge[5] + margin) + 1):
+                self.slabs[slab].append(edge)
+                self._slab_edge_ids[slab].append(i)
+
+    def restore_index(self, slab_count, offsets, edge_ids):
+        # Install a slab index saved from slab_arrays(): slab i lists edges edge_ids[offsets[i]:offsets[i + 1]]
+        height = self.bounds[3] - self.bounds[1]
+        self.slab_count = slab_count
+        self._slab_scale = slab_count / height if height > 0 else 0.0
+        # classify_many can use the saved arrays as they are
+        self._slab_arrays = (np.asarray(offsets), np.asarray(edge_ids)) if numpy() is not None else None
+        ids, starts = edge_ids.tolist(), offsets.tolist()
+        self._slab_edge_ids = [ids[starts[i]:starts[i + 1]] for i in range(slab_count)]
+        edges = self.edges
+        self.slabs = [[edges[i] for i in slab_ids] for slab_ids in self._slab_edge_ids]
+
+    def slab_of(self, y):
+        # Return the index of the slab containing the scanline y (clamped to the MBR)
+        return int(min(max((y - self.bounds[1]) * self._slab_scale, 0), self.slab_count - 1))
+
+    def create_mbr(self):
+        # Create the Minimum Bounding Rectangle (MBR) of the polygon
+        with INSTRUMENTATION.stage("create_mbr", len(self.points)):
+            x_coords, y_coords = coordinates_of(self.points)
+            min_x, max_x = min(x_coords), max(x_coords)
+            min_y, max_y = min(y_coords), max(y_coords)
+        # Define MBR as a list of four points
+        return [Point(min_x, min_y), Point(max_x, min_y), Point(max_x, max_y), Point(min_x, max_y)]
+
+    def point_in_mbr(self, point):
+        # Check if a point is inside the MBR of the polygon
+        x, y = point.x, point.y
+        # Unpack MBR coordinates
+        min_x, min_y, max_x, max_y = self.bounds
+        return min_x <= x <= max_x and min_y <= y <= max_y
+
+    def point_on_edge(self, point, edge):
+        # Check if a point is on the edge of the polygon
+        return Geometry.on_line(point, edge)
+
+    def point_in_polygon(self, point):
+        # Check if a point is inside the polygon, on the boundary, or outside
+        if self.convex:
+            category = self.classify_convex(point.x, point.y)
+        elif self.slabs is not None:
+            # Only the edges of the point's slab can touch or cross its scanline
+            category = self.classify_against_edges(point.x, point.y, self.slabs[self.slab_of(point.y)])
+        else:
+            category = self.classify_against_edges(point.x, point.y, self.edges)
+        if INSTRUMENTATION.enabled:
+            INSTRUMENTATION.count("points")
+            INSTRUMENTATION.count(category)
+        return category
+
+    def classify_convex(self, x, y):
+        # Classify the point (x, y) against a convex polygon: a binary search in each chain finds the
+        # edges whose y range comes within twice the tolerance of the point, the only ones it can
+        # touch or its ray can cross, and the edge scan runs over just those
+        margin = 2 * Geometry.TOLERANCE
+        nearby = []
+        for edges, lows, highs, _ in self.chains:
+            nearby += edges[bisect_left(highs, y - margin):bisect_right(lows, y + margin)]
+        return self.classify_against_edges(x, y, nearby)
+
+    @staticmethod
+    def touches_edge(x, y, edge):
+        # Check if the point (x, y) is on an edge tuple (same test as Geometry.on_line)
+        x1, y1, x2, y2, y_min, y_max, slope, length = edge
+        tolerance = Geometry.TOLERANCE
+        if abs(x - x1) < tolerance and abs(y - y1) < tolerance:
+            return True
+        if abs(x - x2) < tolerance and abs(y - y2) < tolerance:
+            return True
+        if (x1 <= x <= x2 or x2 <= x <= x1) and y_min <= y <= y_max:
+            if abs((x2 - x1) * (y1 - y) - (x1 - x) * (y2 - y1)) / length < tolerance:
+                return True
+            # Rounding can hide a point exactly on a long or far away edge
+            return Geometry.side_of_line(x1, y1, x2, y2, x, y) == 0
+        return False
+
+    @staticmethod
+    def classify_against_edges(x, y, edges):
+        # Classify the point (x, y) against a list of cached edge tuples
+        tolerance = Geometry.TOLERANCE
+        low, high = y + 2 * tolerance, y - 2 * tolerance
+        intersect_count = 0
+        if INSTRUMENTATION.enabled:
+            INSTRUMENTATION.count("edges_visited", len(edges))
+
+        for x1, y1, x2, y2, y_min, y_max, slope, length in edges:
+            # Edges entirely above or below the point can neither touch nor cross it
+            if y_min > low or y_max < high:
+                continue
+
+            # Check if the point is on the edge (same test as Geometry.on_line)
+            if abs(x - x1) < tolerance and abs(y - y1) < tolerance:
+                return "boundary"
+            if abs(x - x2) < tolerance and abs(y - y2) < tolerance:
+                return "boundary"
+            if (x1 <= x <= x2 or x2 <= x <= x1) and y_min <= y <= y_max:
+                if abs((x2 - x1) * (y1 - y) - (x1 - x) * (y2 - y1)) / length < tolerance or \
+                        Geometry.side_of_line(x1, y1, x2, y2, x, y) == 0:
+                    # Within tolerance, or exactly on a long or far away edge where rounding hides it
+                    return "boundary"
+
+            # Use the Ray-Casting Algorithm to count intersections (RCA)
+            if y_min < y <= y_max and x1 + (y - y1) * slope < x + tolerance:
+                intersect_count += 1
+
+        return "inside" if intersect_count % 2 == 1 else "outside"
+
+    def classify_point_using_mbr_and_rca(self, point):
+        # Classify a point using MBR and the Ray-Casting Algorithm (RCA)
+        if self.point_in_mbr(point):
+            # If the point is inside the MBR, further classify using the Ray-Casting Algorithm
+            if INSTRUMENTATION.enabled:
+                INSTRUMENTATION.count("mbr_tests")
+            return self.point_in_polygon(point)
+        else:
+            # If the point is outside the MBR, classify as "outside"
+            if INSTRUMENTATION.enabled:
+                INSTRUMENTATION.count("mbr_tests")
+                INSTRUMENTATION.count("mbr_rejects")
+            return "outside"
+
+    # Maximum number of point/edge pairs evaluated at once by classify_many
+    BATCH_CELLS = 1 << 20
+
+    def edge_arrays(self):
+        # Return the cached edges as NumPy columns (x1, y1, x2, y2, y_min, y_max, slope, length)
+        if self._edge_arrays is None:
+            self._edge_arrays = tuple(np.array(column, dtype=np.float64) for column in zip(*self.edges))
+        return self._edge_arrays
+
+    def slab_arrays(self):
+        # Return the slab index as NumPy arrays: slab i owns edge_ids[offsets[i]:offsets[i + 1]]
+        if self._slab_arrays is None:
+            sizes = [len(ids) for ids in self._slab_edge_ids]
+            offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+            np.cumsum(sizes, out=offsets[1:])
+            edge_ids = np.fromiter((i for ids in self._slab_edge_ids for i in ids), dtype=np.int64,
+                                   count=int(offsets[-1]))
+            self._slab_arrays = (offsets, edge_ids)
+        return self._slab_arrays
+
+    @staticmethod
+    def edge_tests(x, y, columns):
+        # Evaluate the on-edge and ray-crossing tests for points (x, y) against edge columns;
+        # the arguments only need to broadcast against each other
+        x1, y1, x2, y2, y_min, y_max, slope, length = columns
+        tol = Geometry.TOLERANCE
+
+        # Boundary test, mirroring Geometry.on_line
+        on_edge = (np.abs(x - x1) < tol) & (np.abs(y - y1) < tol)
+        on_edge |= (np.abs(x - x2) < tol) & (np.abs(y - y2) < tol)
+        in_box = (((x1 <= x) & (x <= x2)) | ((x2 <= x) & (x <= x1))) & (y_min <= y) & (y <= y_max)
+        left = (x2 - x1) * (y1 - y)
+        right = (x1 - x) * (y2 - y1)
+        cross = np.abs(left - right)
+        on_edge |= in_box & (cross / length < tol)
+        # Vectorized side_of_line: the few pairs within the error bound are checked exactly
+        uncertain = in_box & ~on_edge & (cross <= Geometry.ORIENTATION_ERROR * (np.abs(left) + np.abs(right)))
+        if uncertain.any():
+            found = np.nonzero(uncertain)
+            values = [np.broadcast_to(value, uncertain.shape)[found].tolist() for value in (x1, y1, x2, y2, x, y)]
+            on_edge[found] = [Geometry.exact_orientation(*value) == 0 for value in zip(*values)]
+
+        # Ray-Casting Algorithm: the edge is crossed to the left of the point
+        crosses = (y_min < y) & (y <= y_max) & (x1 + (y - y1) * slope < x + tol)
+        return on_edge, crosses
+
+    def classify_many(self, xs, ys, batch_cells=None):
+        # Classify many points at once and return an array of category codes
+        # (Geometry.OUTSIDE, Geometry.INSIDE or Geometry.BOUNDARY), one per point
+        if numpy() is None:
+            # Without NumPy fall back to the scalar Ray-Casting Algorithm for the points within
+            # tolerance of the MBR
+            tol = Geometry.TOLERANCE
+            codes = array('B', bytes(len(xs)))
+            if not self.edges:
+                return codes
+            min_x, min_y, max_x, max_y = self.bounds
+            candidates = [i for i, (x, y) in enumerate(zip(xs, ys))
+                          if min_x - tol <= x <= max_x + tol and min_y - tol <= y <= max_y + tol]
+            if INSTRUMENTATION.enabled:
+                INSTRUMENTATION.count("mbr_tests", len(xs))
+                INSTRUMENTATION.count("mbr_rejects", len(xs) - len(candidates))
+            for i in candidates:
+                codes[i] = Geometry.CATEGORIES.index(self.point_in_polygon(Point(xs[i], ys[i])))
+            return codes
+
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        codes = np.zeros(len(xs), dtype=np.uint8)
+        if not self.edges or len(xs) == 0:
+            return codes
+
+        # Only points within tolerance of the MBR can be inside or on the boundary
+        tol = Geometry.TOLERANCE
+        min_x, min_y, max_x, max_y = self.bounds
+        candidates = np.flatnonzero((xs >= min_x - tol) & (xs <= max_x + tol) &
+                                    (ys >= min_y - tol) & (ys <= max_y + tol))
+        batch_cells = batch_cells or self.BATCH_CELLS
+        if INSTRUMENTATION.enabled:
+            INSTRUMENTATION.count("mbr_tests", len(xs))
+            INSTRUMENTATION.count("mbr_rejects", len(xs) - len(candidates))
+            INSTRUMENTATION.count("points", len(candidates))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if self.convex:
+                # Binary searches over the chains, for all the points at once
+                codes[candidates] = self.classify_convex_many(xs[candidates], ys[candidates], batch_cells)
+            elif self.slabs is None:
+                # Test every candidate against every edge, in chunks so the (points x edges)
+                # temporaries stay bounded
+                columns = self.edge_arrays()
+                rows = max(1, batch_cells // len(self.edges))
+                if INSTRUMENTATION.enabled:
+                    INSTRUMENTATION.count("edges_visited", len(candidates) * len(self.edges))
+                for start in range(0, len(candidates), rows):
+                    index = candidates[start:start + rows]
+                    on_edge, crosses = self.edge_tests(xs[index, None], ys[index, None], columns)
+                    boundary = on_edge.any(axis=1)
+                    inside = np.count_nonzero(crosses, axis=1) % 2 == 1
+                    codes[index] = np.where(boundary, Geometry.BOUNDARY,
+                                            np.where(inside, Geometry.INSIDE, Geometry.OUTSIDE))
+            else:
+                # Test every candidate only against the edges of its slab, as flat (point, edge) pairs
+                for index, owner, edge_ids in self.slab_pairs(xs, ys, candidates, batch_cells):
+                    if INSTRUMENTATION.enabled:
+                        INSTRUMENTATION.count("edges_visited", len(edge_ids))
+                    columns = tuple(column[edge_ids] for column in self.edge_arrays())
+                    on_edge, crosses = self.edge_tests(xs[index][owner], ys[index][owner], columns)
+                    boundary = np.bincount(owner, weights=on_edge, minlength=len(index)) > 0
+                    inside = np.bincount(owner, weights=crosses, minlength=len(index)).astype(np.int64) % 2 == 1
+                    codes[index] = np.where(boundary, Geometry.BOUNDARY,
+                                            np.where(inside, Geometry.INSIDE, Geometry.OUTSIDE))
+
+        if INSTRUMENTATION.enabled:
+            for category, count in zip(Geometry.CATEGORIES, np.bincount(codes[candidates], minlength=3)):
+                INSTRUMENTATION.count(category, int(count))
+        return codes
+
+    def chain_arrays(self):
+        # Return the chains as NumPy (edge_ids, lows, highs) arrays, the edge ids indexing edge_arrays()
+        if self._chain_arrays is None:
+            self._chain_arrays = tuple((np.array(edge_ids, dtype=np.int64), np.array(lows, dtype=np.float64),
+                                        np.array(highs, dtype=np.float64))
+                                       for _, lows, highs, edge_ids in self.chains)
+        return self._chain_arrays
+
+    def classify_convex_many(self, xs, ys, batch_cells=None):
+        # Vectorized classify_convex: the binary searches of all the points run together, then every
+        # point is tested against the edges they found, as flat (point, edge) pairs
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        batch_cells = batch_cells or self.BATCH_CELLS
+        margin = 2 * Geometry.TOLERANCE
+        points = np.arange(len(xs))
+        boundary = np.zeros(len(xs), dtype=bool)
+        crossings = np.zeros(len(xs), dtype=np.int64)
+        for edge_ids, lows, highs in self.chain_arrays():
+            starts = np.searchsorted(highs, ys - margin, side='left')
+            stops = np.maximum(np.searchsorted(lows, ys + margin, side='right'), starts)
+            for index, owner, ids in range_pairs(starts, stops, edge_ids, points, batch_cells):
+                if INSTRUMENTATION.enabled:
+                    INSTRUMENTATION.count("edges_visited", len(ids))
+                columns = tuple(column[ids] for column in self.edge_arrays())
+                on_edge, crosses = self.edge_tests(xs[index][owner], ys[index][owner], columns)
+                boundary[index] |= np.bincount(owner, weights=on_edge, minlength=len(index)) > 0
+                crossings[index] += np.bincount(owner, weights=crosses, minlength=len(index)).astype(np.int64)
+        return np.where(boundary, Geometry.BOUNDARY,
+                        np.where(crossings % 2 == 1, Geometry.INSIDE, Geometry.OUTSIDE)).astype(np.uint8)
+
+    def slab_pairs(self, xs, ys, candidates, batch_cells):
+        # Yield (index, owner, edge_ids) chunks pairing each candidate point with the edges of its
+        # slab: pair k tests point index[owner[k]] against edge edge_ids[k]
+        offsets, slab_edge_ids = self.slab_arrays()
+        slabs = np.clip((ys[candidates] - self.bounds[1]) * self._slab_scale, 0,
+                        self.slab_count - 1).astype(np.int64)
+        return group_pairs(offsets, slab_edge_ids, slabs, candidates, batch_cells)
+
+    def classify_sweep(self, xs, ys):
+        # Classify many points in one plane sweep and return category codes in input order, the same as
+        # point_in_polygon. The points are visited by increasing y; between two consecutive vertex
+        # heights the edges crossing the scanline stay the same and, as edges do not cross, keep their
+        # x order, so each such strip sorts its active edges once and every point of the strip finds
+        # its crossing count and its nearby edges by binary search over their x ranges. With few edges
+        # per scanline this is O((n + m) log(n + m)) for n edges and m points.
+        count = len(xs)
+        codes = np.zeros(count, dtype=np.uint8) if numpy() is not None else array('B', bytes(count))
+        if not self.edges or count == 0:
+            return codes
+
+        if hasattr(xs, 'tolist'):
+            # Plain floats are much faster to work with than NumPy scalars
+            xs, ys = xs.tolist(), ys.tolist()
+        tolerance = Geometry.TOLERANCE
+        min_x, min_y, max_x, max_y = self.bounds
+        # Computed edge x positions are within a few ulps of the true ones; positions closer than
+        # slack to a threshold are tested exactly, the others are decided by the order alone
+        scale = max(abs(min_x), abs(min_y), abs(max_x), abs(max_y), 1.0)
+        slack = scale * 2.0 ** -46
+
+        edges = self.edges
+        # Edge ends by height, to find the edges with an end within tolerance of a scanline
+        ends = sorted((y, i) for i, edge in enumerate(edges) for y in (edge[1], edge[3]))
+        end_ys = [y for y, _ in ends]
+        # Non-horizontal edges by their lowest point and by their highest point: the sweep events
+        rising = [i for i, edge in enumerate(edges) if edge[4] < edge[5]]
+        starts = sorted(rising, key=lambda i: edges[i][4])
+        stops = sorted(rising, key=lambda i: edges[i][5])
+        levels = sorted({edges[i][4] for i in rising} | {edges[i][5] for i in rising})
+
+        active = {}  # Edges crossing the current strip, by index
+        order = []  # Active edges sorted by x, or None when some of them cross inside the strip
+        lefts, rights = [], []  # Smallest and largest x of each edge of order within the strip
+        reach = 0.0  # Largest horizontal distance at which an active edge can touch a point
+        level = -1  # The current strip lies between levels[level] and levels[level + 1]
+        upper = levels[0] if levels else math.inf  # Top of the current strip
+        next_start = next_stop = 0
+
+        # Only points within tolerance of the MBR can be inside or on the boundary; the others keep
+        # the Geometry.OUTSIDE code they start with
+        points = sorted((i for i in range(count) if min_x - tolerance <= xs[i] <= max_x + tolerance
+                         and min_y - tolerance <= ys[i] <= max_y + tolerance), key=ys.__getitem__)
+        touches_edge = self.touches_edge
+        end_margin = tolerance + slack
+        for index in points:
+            x, y = xs[index], ys[index]
+            if y > upper:
+                # Move the sweep to the strip levels[level] < y <= levels[level + 1]
+                while level + 1 < len(levels) and levels[level + 1] < y:
+                    level += 1
+                    while next_start < len(starts) and edges[starts[next_start]][4] <= levels[level]:
+                        active[starts[next_start]] = edges[starts[next_start]]
+                        next_start += 1
+                    while next_stop < len(stops) and edges[stops[next_stop]][5] <= levels[level]:
+                        del active[stops[next_stop]]
+                        next_stop += 1
+                upper = levels[level + 1] if level + 1 < len(levels) else math.inf
+
+                order, lefts, rights, reach = [], [], [], 0.0
+                if level + 1 < len(levels):
+                    low, high = levels[level], upper
+                    middle = (low + high) / 2
+                    order = sorted(active.values(), key=lambda edge: edge[0] + (middle - edge[1]) * edge[6])
+                    at_low = [edge[0] + (low - edge[1]) * edge[6] for edge in order]
+                    at_high = [edge[0] + (high - edge[1]) * edge[6] for edge in order]
+                    if any(left > right + slack for positions in (at_low, at_high)
+                           for left, right in zip(positions, positions[1:])):
+                        # Edges cross inside the strip, so its points scan every active edge
+                        order = None
+                    else:
+                        # In x order at both ends, so the x ranges of the edges are sorted too
+                        lefts = list(map(min, at_low, at_high))
+                        rights = list(map(max, at_low, at_high))
+                    for edge in active.values():
+                        # A point within tolerance of an edge is within this distance of it along x
+                        reach = max(reach, 2 * tolerance * edge[7] / (edge[5] - edge[4]))
+
+            # Crossings: edges of the strip whose x at the scanline is below x + tolerance
+            threshold = x + tolerance
+            if order is None:
+                nearby = list(active.values())
+                undecided, crossings = nearby, 0
+            else:
+                # Edges entirely left of threshold count, edges entirely right of it do not, and only
+                # the ones in between are tested
+                crossings = bisect_left(rights, threshold - slack)
+                undecided = order[crossings:bisect_left(lefts, threshold + slack, crossings)]
+                nearby = order[bisect_left(rights, x - reach - slack):bisect_right(lefts, x + reach + slack)]
+            for x1, y1, _, _, _, _, slope, _ in undecided:
+                if x1 + (y - y1) * slope < threshold:
+                    crossings += 1
+
+            # Boundary: the strip's edges near x and the edges with an end near the scanline
+            boundary = False
+            for edge in nearby:
+                if touches_edge(x, y, edge):
+                    boundary = True
+                    break
+            if not boundary:
+                end = bisect_left(end_ys, y - end_margin)
+                while end < len(end_ys) and end_ys[end] <= y + end_margin:
+                    if touches_edge(x, y, edges[ends[end][1]]):
+                        boundary = True
+                        break
+                    end += 1
+
+            if boundary:
+                codes[index] = Geometry.BOUNDARY
+            elif crossings % 2 == 1:
+                codes[index] = Geometry.INSIDE
+        return codes
+
+    @staticmethod
+    def raster_axes(bounds, columns, rows):
+        # Return the x coordinates of the cell centres of a columns x rows grid over bounds, and the
+        # y coordinates of its rows from the bottom up
+        min_x, min_y, max_x, max_y = bounds
+        width, height = (max_x - min_x) / columns, (max_y - min_y) / rows
+        return ([min_x + (column + 0.5) * width for column in range(columns)],
+                [min_y + (row + 0.5) * height for row in range(rows)])
+
+    def rasterize(self, bounds=None, resolution=1024, filename=None):
+        # Classify the cell centres of a regular grid over bounds (the MBR by default) and return their
+        # category codes as a rows x columns uint8 mask, bottom row first (a flat array('B') without
+        # NumPy). resolution is the number of columns, with rows chosen so the cells are roughly
+        # square, or a (columns, rows) pair. Each row computes its edge crossings once, sorts them and
+        # fills the spans between them, and only the cells near an edge are tested for the boundary,
+        # so the codes are those point_in_polygon gives at the centres from raster_axes. With filename
+        # the mask is written to a raw file of rows * columns bytes and returned memory-mapped (as a
+        # memoryview without NumPy).
+        min_x, min_y, max_x, max_y = bounds = self.bounds if bounds is None else bounds
+        if isinstance(resolution, int):
+            columns = resolution
+            rows = max(1, round(columns * (max_y - min_y) / (max_x - min_x))) if max_x > min_x else 1
+        else:
+            columns, rows = resolution
+        if columns < 1 or rows < 1:
+            raise ValueError("a raster needs at least one column and one row")
+        xs, ys = self.raster_axes(bounds, columns, rows)
+
+        if filename is None:
+            cells = bytearray(rows * columns)
+        else:
+            with open(filename, 'w+b') as file:
+                file.truncate(rows * columns)
+                cells = mmap.mmap(file.fileno(), rows * columns)
+
+        with INSTRUMENTATION.stage("rasterize", rows * columns):
+            tolerance = Geometry.TOLERANCE
+            # The crossing test of the Ray-Casting Algorithm compares against x + tolerance
+            shifted = [x + tolerance for x in xs]
+            scale = max(abs(min_x), abs(min_y), abs(max_x), abs(max_y), abs(self.bounds[0]),
+                        abs(self.bounds[1]), abs(self.bounds[2]), abs(self.bounds[3]), 1.0)
+            slack = scale * 2.0 ** -40
+            inside = bytes([Geometry.INSIDE]) * columns
+            touches_edge = self.touches_edge
+
+            # Edges by their lowest point; a row keeps the edges within 2 * tolerance of it, the same
+            # edges classify_against_edges looks at
+            edges = sorted(self.edges, key=lambda edge: edge[4])
+            active = []
+            next_edge = 0
+            for row, y in enumerate(ys):
+                while next_edge < len(edges) and edges[next_edge][4] <= y + 2 * tolerance:
+                    active.append(edges[next_edge])
+                    next_edge += 1
+                active = [edge for edge in active if edge[5] >= y - 2 * tolerance]
+                if not active:
+                    continue
+
+                line = bytearray(columns)
+                crossings = sorted(x1 + (y - y1) * slope for x1, y1, _, _, y_min, y_max, slope, _ in active
+                                   if y_min < y <= y_max)
+                # Cells from starts[k] on have crossing k below x + tolerance, so inside runs from
+                # each even start to the next odd one
+                starts = [bisect_right(shifted, crossing) for crossing in crossings] + [columns]
+                for first, last in zip(starts[0::2], starts[1::2]):
+                    line[first:last] = inside[:last - first]
+
+                for edge in active:
+                    x1, y1, x2, y2, y_min, y_max, slope, length = edge
+                    # A point within tolerance of the edge is within this x range of it at height y
+                    low, high = min(x1, x2) - tolerance, max(x1, x2) + tolerance
+                    if y_max > y_min:
+                        reach = 2 * tolerance * length / (y_max - y_min) + tolerance
+                        x = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+                        low, high = max(low, x - reach), min(high, x + reach)
+                    for column in range(bisect_left(xs, low - slack), bisect_right(xs, high + slack)):
+                        if touches_edge(xs[column], y, edge):
+                            line[column] = Geometry.BOUNDARY
+                cells[row * columns:(row + 1) * columns] = line
+
+        if numpy() is not None:
+            return np.frombuffer(cells, dtype=np.uint8).reshape(rows, columns)
+        if filename is not None:
+            return memoryview(cells)
+        return array('B', cells)
+
+class MultiPolygon(Polygon):
+    # Several polygons, each possibly with holes, classified as one shape. The edges of all their rings
+    # go into one edge list, so the scan, slab index and batch paths of Polygon cover every part in a
+    # single pass; the MBR is that of all the outer rings.
+    def __init__(self, parts):
+        self._parts = list(parts)
+        xs, ys = array('d'), array('d')
+        for part in self._parts:
+            part_xs, part_ys = coordinates_of(part.points)
+            xs.extend(part_xs)
+            ys.extend(part_ys)
+        # The points are the vertices of all the outer rings; they set the MBR
+        super().__init__(PointArray(xs, ys))
+
+    def rings(self):
+        # Return the rings of every part, outer ring first within each part
+        return [ring for part in self._parts for ring in part.rings()]
+
+    @property
+    def parts(self):
+        # Polygons making up the shape
+        return self._parts
+
+    def edit_bounds(self, indices, new_points):
+        # The vertices belong to the parts, so edits have to go through them
+        raise TypeError("edit the vertices of a MultiPolygon through its parts and build a new MultiPolygon")
+
+# I have used ChatGPT (Open AI, https://openai.com/) as a generative AI tool to effectively structure certain code segments related to RCA.
+
+class Triangle(Geometry):
+    def __init__(self, vertices):
+        # Initialize a triangle with a list of vertices
+        # Assigning the vertices also builds the cached MBR
+        self.vertices = vertices
+
+    @property
+    def vertices(self):
+        # Vertices of the triangle
+        return self._vertices
+
+    @vertices.setter
+    def vertices(self, vertices):
+        # Replace the vertices and rebuild the cached MBR
+        self._vertices = vertices
+        self.refresh()
+
+    def refresh(self):
+        # Rebuild the cached MBR; call this after editing self.vertices in place
+        self.mbr = self.create_mbr()  # Minimum Bounding Rectangle (MBR) for the triangle
+        self.bounds = (self.mbr[0].x, self.mbr[0].y, self.mbr[2].x, self.mbr[2].y)
+
+    @staticmethod
+    def generate_fixed_triangle():
+        # Define fixed vertices for a triangle and create a Triangle instance
+        vertices = [Point(2, 2), Point(6, 2), Point(4, 6)]
+        return Triangle(vertices)
+
+    def create_mbr(self):
+        # Create the Minimum Bounding Rectangle (MBR) of the triangle
+        x_coords, y_coords = coordinates_of(self.vertices)
+        min_x, max_x = min(x_coords), max(x_coords)
+        min_y, max_y = min(y_coords), max(y_coords)
+        # Define MBR as a list of four points
+        return [Point(min_x, min_y), Point(max_x, min_y), Point(max_x, max_y), Point(min_x, max_y)]
+
+    def point_in_mbr(self, point):
+        # Check if a point is inside the MBR of the triangle
+        min_x, min_y, max_x, max_y = self.bounds
+        return min_x <= point.x <= max_x and min_y <= point.y <= max_y
+
+    def point_on_triangle_edge(self, point):
+        # Check if a point is on any edge of the triangle
+        for i in range(3):
+            edge_start = self.vertices[i]
+            edge_end = self.vertices[(i + 1) % 3]
+
+            # Check if the point is on the current edge
+            if Geometry.on_line(point, (edge_start.x, edge_start.y, edge_end.x, edge_end.y)):
+                return True
+
+        return False
+
+    def point_in_triangle(self, point):
+        # Check if a point is inside the triangle, on the boundary, or outside
+        x, y = point.x, point.y
+        x1, y1 = self.vertices[0].x, self.vertices[0].y
+        x2, y2 = self.vertices[1].x, self.vertices[1].y
+        x3, y3 = self.vertices[2].x, self.vertices[2].y
+
+        # Calculate determinant of the matrix representing the triangle
+        detT = (y2 - y3) * (x1 - x3) + (x3 - x2) * (y1 - y3)
+        alpha = ((y2 - y3) * (x - x3) + (x3 - x2) * (y - y3)) / detT
+        beta = ((y3 - y1) * (x - x3) + (x1 - x3) * (y - y3)) / detT
+        gamma = 1 - alpha - beta
+
+        # Check if the point is on the boundary
+        if self.point_on_triangle_edge(point):
+            return "boundary"
+
+        # Check if the point is inside, considering tolerance
+        if -Geometry.TOLERANCE <= alpha <= 1 + Geometry.TOLERANCE and \
+           -Geometry.TOLERANCE <= beta <= 1 + Geometry.TOLERANCE and \
+           -Geometry.TOLERANCE <= gamma <= 1 + Geometry.TOLERANCE:
+            return "inside"
+        else:
+            return "outside"
+
+    def classify_many(self, xs, ys):
+        # Classify many points one by one and return an array of category codes
+        if hasattr(xs, 'tolist'):
+            xs, ys = xs.tolist(), ys.tolist()
+        codes = [Geometry.CATEGORIES.index(self.point_in_triangle(Point(x, y))) for x, y in zip(xs, ys)]
+        return np.array(codes, dtype=np.uint8) if numpy() is not None else array('B', codes)
+
+    def classify_point_using_mbr_and_rca(self, point):
+        # Classify a point using MBR and the Ray-Casting Algorithm (RCA)
+        if self.point_in_mbr(point):
+            # If the point is inside the MBR, further classify using the Triangle's point_in_triangle method
+            return self.point_in_triangle(point)
+        else:
+            # If the point is outside the MBR, classify as "outside"
+            return "outside"
+
+class Square(Geometry):
+    def __init__(self, side_length):
+        # Initialize a square with a given side length and calculate the MBR
+        self.side_length = side_length
+        self.mbr = self.create_mbr()  # Initialize the MBR
+        self.bounds = (self.mbr[0].x, self.mbr[0].y, self.mbr[2].x, self.mbr[2].y)
+
+    @staticmethod
+    def generate_fixed_square():
+        # Create a square with a fixed side length
+        side_length = 4
+        return Square(side_length)
+
+    def create_mbr(self):
+        # Create the Minimum Bounding Rectangle (MBR) of the square
+        half_side = self.side_length / 2
+        # Define MBR as a list of four points
+        return [Point(-half_side, -half_side), Point(half_side, -half_side), Point(half_side, half_side),
+                Point(-half_side, half_side)]
+
+    def point_in_mbr(self, point):
+        # Check if a point is inside the MBR of the square
+        x, y = point.x, point.y
+        # Unpack MBR coordinates
+        min_x, min_y, max_x, max_y = self.mbr[0].x, self.mbr[0].y, self.mbr[2].x, self.mbr[2].y
+        return min_x <= x <= max_x and min_y <= y <= max_y
+
+    def point_on_edge(self, point, edge):
+        # Check if a point is on the edge of the square
+        return Geometry.on_line(point, edge)
+
+    def point_in_square(self, point):
+        # Check if a point is inside the square, on the boundary, or outside
+        if not self.point_in_mbr(point):
+            return "outside"
+
+        half_side = self.side_length / 2
+        x, y = point.x, point.y
+
+        # Check if the point is on the boundary
+        if abs(x) == half_side or abs(y) == half_side:
+            return "boundary"
+
+        # Check if the point is inside, considering tolerance
+        if -half_side + Geometry.TOLERANCE <= x <= half_side - Geometry.TOLERANCE and \
+                -half_side + Geometry.TOLERANCE <= y <= half_side - Geometry.TOLERANCE:
+            return "inside"
+        else:
+            return "outside"
+
+    def classify_many(self, xs, ys):
+        # Classify many points one by one and return an array of category codes
+        if hasattr(xs, 'tolist'):
+            xs, ys = xs.tolist(), ys.tolist()
+        codes = [Geometry.CATEGORIES.index(self.point_in_square(Point(x, y))) for x, y in zip(xs, ys)]
+        return np.array(codes, dtype=np.uint8) if numpy() is not None else array('B', codes)
+
+class TriangleMesh(Geometry):
+    # Triangulated irregular network (TIN): triangles given as vertex index triples into shared x and
+    # y coordinates. The inverse affine map of every triangle is computed once, so the barycentric
+    # weights of a point are two multiply-adds per weight, and a uniform grid lists the triangles
+    # overlapping each cell, so locating a point only tests the triangles of its cell.
+    def __init__(self, xs, ys, triangles, columns=None, rows=None):
+        # Build the coefficients and the grid. By default the grid has about one cell per triangle,
+        # with roughly square cells.
+        start = time.perf_counter()
+        self.xs = array('d', xs)
+        self.ys = array('d', ys)
+        if numpy() is not None and isinstance(triangles, np.ndarray):
+            self.triangles = array('q', triangles.astype(np.int64).tobytes())
+        else:
+            self.triangles = array('q', [vertex for triangle in triangles for vertex in triangle])
+        self.count = len(self.triangles) // 3
+        if not self.count:
+            raise ValueError("a triangle mesh needs at least one triangle")
+
+        min_x, min_y = min(self.xs), min(self.ys)
+        max_x, max_y = max(self.xs), max(self.ys)
+        self.bounds = (min_x, min_y, max_x, max_y)
+        if columns is None:
+            aspect = (max_x - min_x) / (max_y - min_y) if max_y > min_y else float(self.count)
+            columns = max(1, min(self.count, round(math.sqrt(self.count * aspect))))
+        if rows is None:
+            rows = max(1, min(self.count, round(self.count / columns))) if max_y > min_y else 1
+        self.columns, self.rows = columns, rows
+
+        # Cells are widened by a margin covering the tolerance and rounding in the cell lookup, as
+        # in PolygonGrid, so a point within tolerance of a triangle lands in a cell listing it
+        scale = max(abs(min_x), abs(min_y), abs(max_x), abs(max_y), 1.0)
+        self.margin = 4 * Geometry.TOLERANCE + 16 * scale * 2.0 ** -52
+        self.origin_x, self.origin_y = min_x - self.margin, min_y - self.margin
+        self.cell_width = (max_x - min_x + 2 * self.margin) / columns
+        self.cell_height = (max_y - min_y + 2 * self.margin) / rows
+
+        if numpy() is None:
+            self._build()
+        else:
+            self._build_vectorized()
+        self.build_time = time.perf_counter() - start
+
+    def _build(self):
+        # Compute the coefficients and fill the grid one triangle at a time
+        xs, ys, vertices = self.xs, self.ys, self.triangles
+        coefficients = array('d')
+        cells = [[] for _ in range(self.columns * self.rows)]
+        margin = self.margin
+        for triangle in range(self.count):
+            i, j, k = vertices[3 * triangle:3 * triangle + 3]
+            x1, y1, x2, y2, x3, y3 = xs[i], ys[i], xs[j], ys[j], xs[k], ys[k]
+            coefficients.extend(self._coefficients(x1, y1, x2, y2, x3, y3))
+            first_row = self.row_of(min(y1, y2, y3) - margin)
+            last_row = self.row_of(max(y1, y2, y3) + margin)
+            first_column = self.column_of(min(x1, x2, x3) - margin)
+            last_column = self.column_of(max(x1, x2, x3) + margin)
+            for row in range(first_row, last_row + 1):
+                offset = row * self.columns
+                for column in range(first_column, last_column + 1):
+                    cells[offset + column].append(triangle)
+
+        self.coefficients = coefficients
+        self.cell_offsets = array('q', [0])
+        self.cell_triangles = array('q')
+        for cell in cells:
+            self.cell_triangles.extend(cell)
+            self.cell_offsets.append(len(self.cell_triangles))
+
+    def _build_vectorized(self):
+        # Compute the coefficients and fill the grid with NumPy
+        vertices = np.frombuffer(self.triangles, dtype=np.int64).reshape(-1, 3)
+        xs = np.frombuffer(self.xs, dtype=np.float64)[vertices]
+        ys = np.frombuffer(self.ys, dtype=np.float64)[vertices]
+        x1, x2, x3 = xs.T
+        y1, y2, y3 = ys.T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            coefficients = np.column_stack(self._coefficients(x1, y1, x2, y2, x3, y3))
+        self.coefficients = array('d', coefficients.tobytes())
+
+        margin = self.margin
+        first_columns = np.clip((xs.min(axis=1) - margin - self.origin_x) / self.cell_width, 0,
+                                self.columns - 1).astype(np.int64)
+        last_columns = np.clip((xs.max(axis=1) + margin - self.origin_x) / self.cell_width, 0,
+                               self.columns - 1).astype(np.int64)
+        first_rows = np.clip((ys.min(axis=1) - margin - self.origin_y) / self.cell_height, 0,
+                             self.rows - 1).astype(np.int64)
+        last_rows = np.clip((ys.max(axis=1) + margin - self.origin_y) / self.cell_height, 0,
+                            self.rows - 1).astype(np.int64)
+
+        # One (cell, triangle) pair per cell of each triangle's box, then grouped by cell with the
+        # triangles of a cell kept in index order
+        widths = last_columns - first_columns + 1
+        sizes = widths * (last_rows - first_rows + 1)
+        owner = np.repeat(np.arange(self.count), sizes)
+        within = np.arange(len(owner)) - (np.cumsum(sizes) - sizes)[owner]
+        cells = ((first_rows[owner] + within // widths[owner]) * self.columns +
+                 first_columns[owner] + within % widths[owner])
+        order = np.argsort(cells, kind='stable')
+        offsets = np.zeros(self.columns * self.rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(cells, minlength=self.columns * self.rows), out=offsets[1:])
+        self.cell_offsets = array('q', offsets.tobytes())
+        self.cell_triangles = array('q', owner[order].tobytes())
+
+    @staticmethod
+    def _coefficients(x1, y1, x2, y2, x3, y3):
+        # Return (x3, y3, a_x, a_y, b_x, b_y) so that alpha = a_x * (x - x3) + a_y * (y - y3) and
+        # beta = b_x * (x - x3) + b_y * (y - y3), the weights computed by Triangle.point_in_triangle.
+        # Degenerate triangles get NaN coefficients, which no point matches.
+        det = (y2 - y3) * (x1 - x3) + (x3 - x2) * (y1 - y3)
+        if numpy() is None or not isinstance(det, np.ndarray):
+            if det == 0:
+                return x3, y3, math.nan, math.nan, math.nan, math.nan
+        else:
+            det = np.where(det == 0, np.nan, det)
+        return x3, y3, (y2 - y3) / det, (x3 - x2) / det, (y3 - y1) / det, (x1 - x3) / det
+
+    @staticmethod
+    def from_triangles(triangles):
+        # Build a mesh from Triangle objects; their vertices are not shared
+        xs, ys = [], []
+        for triangle in triangles:
+            for vertex in triangle.vertices:
+                xs.append(vertex.x)
+                ys.append(vertex.y)
+        return TriangleMesh(xs, ys, [(3 * i, 3 * i + 1, 3 * i + 2) for i in range(len(triangles))])
+
+    def column_of(self, x):
+        # Return the column containing x, clamped to the grid
+        return int(min(max((x - self.origin_x) / self.cell_width, 0), self.columns - 1))
+
+    def row_of(self, y):
+        # Return the row containing y, clamped to the grid
+        return int(min(max((y - self.origin_y) / self.cell_height, 0), self.rows - 1))
+
+    def locate(self, point):
+        # Return (triangle index, (alpha, beta, gamma)) for the first triangle containing the point,
+        # with the tolerance of Triangle.point_in_triangle, or (-1, None) when no triangle does
+        x, y = point.x, point.y
+        if not (self.origin_x <= x <= self.origin_x + self.columns * self.cell_width and
+                self.origin_y <= y <= self.origin_y + self.rows * self.cell_height):
+            return -1, None
+
+        cell = self.row_of(y) * self.columns + self.column_of(x)
+        c = self.coefficients
+        low, high = -Geometry.TOLERANCE, 1 + Geometry.TOLERANCE
+        for triangle in self.cell_triangles[self.cell_offsets[cell]:self.cell_offsets[cell + 1]]:
+            k = 6 * triangle
+            dx, dy = x - c[k], y - c[k + 1]
+            alpha = c[k + 2] * dx + c[k + 3] * dy
+            if not low <= alpha <= high:
+                continue
+            beta = c[k + 4] * dx + c[k + 5] * dy
+            gamma = 1 - alpha - beta
+            if low <= beta <= high and low <= gamma <= high:
+                return triangle, (alpha, beta, gamma)
+        return -1, None
+
+    def locate_many(self, xs, ys, batch_cells=Polygon.BATCH_CELLS):
+        # Locate many points at once. Returns the triangle index of every point (-1 when none) and
+        # its barycentric weights: an (n, 3) array with NaN rows for unlocated points, or a list of
+        # (alpha, beta, gamma) tuples and None without NumPy.
+        if numpy() is None:
+            located = [self.locate(Point(x, y)) for x, y in zip(xs, ys)]
+            return array('q', [triangle for triangle, _ in located]), [weights for _, weights in located]
+
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        indices = np.full(len(xs), -1, dtype=np.int64)
+        weights = np.full((len(xs), 3), np.nan)
+        candidates = np.flatnonzero((xs >= self.origin_x) & (xs <= self.origin_x + self.columns * self.cell_width) &
+                                    (ys >= self.origin_y) & (ys <= self.origin_y + self.rows * self.cell_height))
+        columns = np.clip((xs[candidates] - self.origin_x) / self.cell_width, 0, self.columns - 1).astype(np.int64)
+        rows = np.clip((ys[candidates] - self.origin_y) / self.cell_height, 0, self.rows - 1).astype(np.int64)
+
+        offsets = np.frombuffer(self.cell_offsets, dtype=np.int64)
+        cell_triangles = np.frombuffer(self.cell_triangles, dtype=np.int64)
+        coefficients = np.frombuffer(self.coefficients, dtype=np.float64).reshape(-1, 6)
+        low, high = -Geometry.TOLERANCE, 1 + Geometry.TOLERANCE
+        for index, owner, triangles in group_pairs(offsets, cell_triangles, rows * self.columns + columns,
+                                                    candidates, batch_cells):
+            c = coefficients[triangles]
+            dx = xs[index][owner] - c[:, 0]
+            dy = ys[index][owner] - c[:, 1]
+            alpha = c[:, 2] * dx + c[:, 3] * dy
+            beta = c[:, 4] * dx + c[:, 5] * dy
+            gamma = 1 - alpha - beta
+            hit = np.flatnonzero((alpha >= low) & (alpha <= high) & (beta >= low) & (beta <= high) &
+                                 (gamma >= low) & (gamma <= high))
+            # The pairs of a point follow the cell order, so its first hit is the first triangle
+            hit_owners, first = np.unique(owner[hit], return_index=True)
+            hit = hit[first]
+            located = index[hit_owners]
+            indices[located] = triangles[hit]
+            weights[located] = np.column_stack((alpha[hit], beta[hit], gamma[hit]))
+        return indices, weights
+
+    def stats(self):
+        # Report the mesh and grid sizes, memory and build time
+        return {
+            "triangles": self.count,
+            "columns": self.columns,
+            "rows": self.rows,
+            "mean_cell_triangles": len(self.cell_triangles) / (self.columns * self.rows),
+            "bytes": (self.coefficients.itemsize * len(self.coefficients) +
+                      self.cell_offsets.itemsize * (len(self.cell_offsets) + len(self.cell_triangles))),
+            "build_time": self.build_time,
+        }
+
+class ClassifiedPoints:
+    # Stored categories of a set of points against a polygon, kept up to date while the polygon's
+    # vertices are edited: only the points inside the box returned by the edit are reclassified.
+    # The points are kept sorted by x so the points in a box are found by binary search.
+    def __init__(self, polygon, xs, ys):
+        self.polygon = polygon
+        if numpy() is not None:
+            self.xs = np.asarray(xs, dtype=np.float64)
+            self.ys = np.asarray(ys, dtype=np.float64)
+            self.order = np.argsort(self.xs, kind='stable')
+        else:
+            self.xs = array('d', xs)
+            self.ys = array('d', ys)
+            self.order = sorted(range(len(self.xs)), key=self.xs.__getitem__)
+        self.sorted_xs = self.xs[self.order] if numpy() is not None else [self.xs[i] for i in self.order]
+        self.codes = polygon.classify_many(self.xs, self.ys)  # One category code per point
+        self.touched = len(self.xs)  # Points classified by the last update
+
+    def categories(self):
+        # Return the current category names, in point order
+        return [Geometry.CATEGORIES[code] for code in self.codes]
+
+    def points_in(self, bounds):
+        # Return the indices of the points inside the (min_x, min_y, max_x, max_y) box
+        min_x, min_y, max_x, max_y = bounds
+        if numpy() is not None:
+            index = self.order[np.searchsorted(self.sorted_xs, min_x, 'left'):
+                               np.searchsorted(self.sorted_xs, max_x, 'right')]
+            return index[(self.ys[index] >= min_y) & (self.ys[index] <= max_y)]
+        index = self.order[bisect_left(self.sorted_xs, min_x):bisect_right(self.sorted_xs, max_x)]
+        return [i for i in index if min_y <= self.ys[i] <= max_y]
+
+    def reclassify(self, bounds):
+        # Reclassify the points inside bounds against the polygon and return how many there were
+        index = self.points_in(bounds)
+        if numpy() is not None:
+            self.codes[index] = self.polygon.classify_many(self.xs[index], self.ys[index])
+        else:
+            codes = self.polygon.classify_many([self.xs[i] for i in index], [self.ys[i] for i in index])
+            for i, code in zip(index, codes):
+                self.codes[i] = code
+        self.touched = len(index)
+        if INSTRUMENTATION.enabled:
+            INSTRUMENTATION.count("points_reclassified", self.touched)
+        return self.touched
+
+    def move_vertex(self, index, point):
+        # Move a polygon vertex and reclassify the affected points; returns how many were reclassified
+        return self.reclassify(self.polygon.move_vertex(index, point))
+
+    def insert_vertex(self, index, point):
+        # Insert a polygon vertex and reclassify the affected points; returns how many were reclassified
+        return self.reclassify(self.polygon.insert_vertex(index, point))
+
+    def delete_vertex(self, index):
+        # Delete a polygon vertex and reclassify the affected points; returns how many were reclassified
+        return self.reclassify(self.polygon.delete_vertex(index))
+
+class PolygonGrid(Geometry):
+    # Cell label for cells crossed by the polygon boundary; their points fall back to the polygon
+    MIXED = 3
+
+    def __init__(self, polygon, columns=64, rows=None, cells=None):
+        # Rasterize the MBR of a polygon into columns x rows cells labelled inside, outside or mixed.
+        # By default rows is chosen so the cells are roughly square. Cell labels saved from an
+        # identical grid (see PolygonCache) can be passed in to skip the rasterization; they are
+        # used as they are, without a copy.
+        start = time.perf_counter()
+        self.polygon = polygon
+        min_x, min_y, max_x, max_y = polygon.bounds
+        if rows is None:
+            rows = max(1, round(columns * (max_y - min_y) / (max_x - min_x))) if max_x > min_x else 1
+        self.columns, self.rows = columns, rows
+
+        # Cells are widened by a margin covering the tolerance and rounding in the cell lookup, so a
+        # cell that no edge reaches cannot hold a boundary point
+        scale = max(abs(min_x), abs(min_y), abs(max_x), abs(max_y), 1.0)
+        self.margin = 4 * Geometry.TOLERANCE + 16 * scale * 2.0 ** -52
+        self.origin_x, self.origin_y = min_x - self.margin, min_y - self.margin
+        self.cell_width = (max_x - min_x + 2 * self.margin) / columns
+        self.cell_height = (max_y - min_y + 2 * self.margin) / rows
+
+        if cells is not None:
+            self.cells = cells
+        else:
+            self.cells = bytearray(columns * rows)  # One label per cell, row by row
+            self._mark_mixed_cells()
+            self._label_pure_cells()
+
+        self.build_time = time.perf_counter() - start
+        self.hits = 0  # Queries answered from a pure cell or outside the grid
+        self.misses = 0  # Queries that fell back to the polygon
+
+    def _mark_mixed_cells(self):
+        # Mark every cell that an edge passes through, or comes within the margin of, as mixed
+        margin = self.margin
+        for x1, y1, x2, y2, y_min, y_max, slope, length in self.polygon.edges:
+            first_row = self.row_of(y_min - margin)
+            last_row = self.row_of(y_max + margin)
+            for row in range(first_row, last_row + 1):
+                # Clip the edge to the horizontal band of this row
+                band_low = self.origin_y + row * self.cell_height - margin
+                band_high = band_low + self.cell_height + 2 * margin
+                if y1 == y2:
+                    x_low, x_high = min(x1, x2), max(x1, x2)
+                else:
+                    t1 = min(max((band_low - y1) / (y2 - y1), 0.0), 1.0)
+                    t2 = min(max((band_high - y1) / (y2 - y1), 0.0), 1.0)
+                    x_low = min(x1 + t1 * (x2 - x1), x1 + t2 * (x2 - x1))
+                    x_high = max(x1 + t1 * (x2 - x1), x1 + t2 * (x2 - x1))
+                offset = row * self.columns
+                for column in range(self.column_of(x_low - margin), self.column_of(x_high + margin) + 1):
+                    self.cells[offset + column] = self.MIXED
+
+    def _label_pure_cells(self):
+        # Runs of pure cells between mixed cells in a row share one label, taken from the polygon
+        # at the centre of the run's first cell
+        for row in range(self.rows):
+            offset = row * self.columns
+            centre_y = self.origin_y + (row + 0.5) * self.cell_height
+            label = None
+            for column in range(self.columns):
+                if self.cells[offset + column] == self.MIXED:
+                    label = None
+                    continue
+                if label is None:
+                    centre_x = self.origin_x + (column + 0.5) * self.cell_width
+                    label = Geometry.CATEGORIES.index(self.polygon.point_in_polygon(Point(centre_x, centre_y)))
+                self.cells[offset + column] = label
+
+    def column_of(self, x):
+        # Return the column containing x, clamped to the grid
+        return int(min(max((x - self.origin_x) / self.cell_width, 0), self.columns - 1))
+
+    def row_of(self, y):
+        # Return the row containing y, clamped to the grid
+        return int(min(max((y - self.origin_y) / self.cell_height, 0), self.rows - 1))
+
+    def classify(self, point):
+        # Classify a point from its cell label, falling back to the polygon in mixed cells
+        x, y = point.x, point.y
+        if not (self.origin_x <= x <= self.origin_x + self.columns * self.cell_width and
+                self.origin_y <= y <= self.origin_y + self.rows * self.cell_height):
+            # Outside the widened MBR the point cannot be inside or on the boundary
+            self.hits += 1
+            return "outside"
+
+        label = self.cells[self.row_of(y) * self.columns + self.column_of(x)]
+        if label == self.MIXED:
+            self.misses += 1
+            return self.polygon.point_in_polygon(point)
+        self.hits += 1
+        return Geometry.CATEGORIES[label]
+
+    def classify_many(self, xs, ys):
+        # Classify many points at once and return an array of category codes
+        if numpy() is None:
+            return array('B', [Geometry.CATEGORIES.index(self.classify(Point(x, y))) for x, y in zip(xs, ys)])
+
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        in_grid = ((xs >= self.origin_x) & (xs <= self.origin_x + self.columns * self.cell_width) &
+                   (ys >= self.origin_y) & (ys <= self.origin_y + self.rows * self.cell_height))
+        columns = np.clip((xs - self.origin_x) / self.cell_width, 0, self.columns - 1).astype(np.int64)
+        rows = np.clip((ys - self.origin_y) / self.cell_height, 0, self.rows - 1).astype(np.int64)
+        codes = np.frombuffer(self.cells, dtype=np.uint8)[rows * self.columns + columns]
+        codes[~in_grid] = Geometry.OUTSIDE
+
+        mixed = np.flatnonzero(codes == self.MIXED)
+        if len(mixed):
+            codes[mixed] = self.polygon.classify_many(xs[mixed], ys[mixed])
+        self.misses += len(mixed)
+        self.hits += len(codes) - len(mixed)
+        return codes
+
+    def stats(self):
+        # Report the grid size, memory, build time and the hit rate of the queries so far
+        queries = self.hits + self.misses
+        return {
+            "columns": self.columns,
+            "rows": self.rows,
+            "cell_bytes": len(self.cells),
+            "mixed_cells": bytes(self.cells).count(self.MIXED),
+            "build_time": self.build_time,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / queries if queries else 0.0,
+        }
+
+def space_filling_order(xs, ys, curve="hilbert", bits=16):
+    # Return the order (a list of indices, a NumPy array with NumPy) that visits the points along a
+    # Morton (Z-order) or Hilbert curve through a 2**bits x 2**bits grid over their MBR, so points
+    # close in the order are close in the plane. Hilbert keeps neighbours together better, Morton is
+    # cheaper to compute. bits is at most 31, so the keys fit in 64-bit integers.
+    if curve not in ("morton", "hilbert"):
+        raise ValueError(f"unknown space-filling curve: {curve}")
+    if not 1 <= bits <= 31:
+        raise ValueError(f"bits must be between 1 and 31, not {bits}")
+    size = 1 << bits
+    if numpy() is not None:
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        if len(xs) == 0:
+            return np.zeros(0, dtype=np.int64)
+        cells = []
+        for values in (xs, ys):
+            low, span = values.min(), values.max() - values.min()
+            cells.append(((values - low) / span * (size - 1)).astype(np.int64) if span > 0 else
+                         np.zeros(len(values), dtype=np.int64))
+        x, y = cells
+        if curve == "morton":
+            keys = _spread_bits(x) | (_spread_bits(y) << 1)
+        else:
+            keys = np.zeros(len(x), dtype=np.int64)
+            step = size >> 1
+            while step:
+                right, up = (x & step) > 0, (y & step) > 0
+                keys += step * step * ((3 * right) ^ up)
+                # Rotate the quadrant so the curve inside it runs in the standard orientation
+                flip = right & ~up
+                x, y = np.where(flip, size - 1 - x, x), np.where(flip, size - 1 - y, y)
+                x, y = np.where(up, x, y), np.where(up, y, x)
+                step >>= 1
+        return np.argsort(keys, kind='stable')
+
+    if not len(xs):
+        return []
+    min_x, min_y = min(xs), min(ys)
+    scale_x = (size - 1) / (max(xs) - min_x) if max(xs) > min_x else 0.0
+    scale_y = (size - 1) / (max(ys) - min_y) if max(ys) > min_y else 0.0
+    keys = []
+    for x, y in zip(xs, ys):
+        x, y = int((x - min_x) * scale_x), int((y - min_y) * scale_y)
+        if curve == "morton":
+            keys.append(_spread_bits(x) | (_spread_bits(y) << 1))
+            continue
+        key = 0
+        step = size >> 1
+        while step:
+            right, up = (x & step) > 0, (y & step) > 0
+            key += step * step * ((3 * right) ^ up)
+            if not up:
+                if right:
+                    x, y = size - 1 - x, size - 1 - y
+                x, y = y, x
+            step >>= 1
+        keys.append(key)
+    return sorted(range(len(keys)), key=keys.__getitem__)
+
+def _spread_bits(value):
+    # Move the lower 32 bits of value to the even bit positions (Morton interleaving)
+    value = (value | (value << 16)) & 0x0000FFFF0000FFFF
+    value = (value | (value << 8)) & 0x00FF00FF00FF00FF
+    value = (value | (value << 4)) & 0x0F0F0F0F0F0F0F0F
+    value = (value | (value << 2)) & 0x3333333333333333
+    return (value | (value << 1)) & 0x5555555555555555
+
+class ClassificationMemo:
+    # Bounded LRU memo of category codes in front of a polygon, for point streams with many repeated
+    # coordinates. Points are keyed by their coordinates rounded to a grid of quantum (the tolerance
+    # by default), so points that close share an answer; the answer can then only differ from a fresh
+    # classification for points at the edge of the tolerance band around the boundary. quantum=0 keys
+    # by the exact coordinates and never changes an answer.
+    def __init__(self, polygon, capacity=1 << 16, quantum=Geometry.TOLERANCE, curve=None):
+        if capacity < 1:
+            raise ValueError("memo capacity must be at least 1")
+        self.polygon = polygon
+        self.capacity = capacity
+        self.quantum = quantum
+        self.curve = curve  # Default space-filling curve of classify_many
+        self.codes = OrderedDict()  # Category code by key, least recently used first
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def bounds(self):
+        # MBR of the polygon, so a memo can stand in for it in a ShapeSet
+        return self.polygon.bounds
+
+    def key_of(self, x, y):
+        # Return the memo key of the point (x, y)
+        if self.quantum:
+            return round(x / self.quantum), round(y / self.quantum)
+        return x, y
+
+    def _remember(self, key, code):
+        # Store a code, evicting the least recently used entries beyond the capacity
+        self.codes[key] = code
+        if len(self.codes) > self.capacity:
+            self.codes.popitem(last=False)
+
+    def classify(self, point):
+        # Classify one point, from the memo when its key is there
+        key = self.key_of(point.x, point.y)
+        code = self.codes.get(key)
+        if code is None:
+            code = Geometry.CATEGORIES.index(self.polygon.point_in_polygon(point))
+            self._remember(key, code)
+            self.misses += 1
+            counter = "memo_misses"
+        else:
+            self.codes.move_to_end(key)
+            self.hits += 1
+            counter = "memo_hits"
+        if INSTRUMENTATION.enabled:
+            INSTRUMENTATION.count(counter)
+        return Geometry.CATEGORIES[code]
+
+    def classify_many(self, xs, ys, curve=None):
+        # Classify many points and return their category codes in input order. With a curve ("morton"
+        # or "hilbert", self.curve by default) the points are looked up in space_filling_order, so
+        # repeated and nearby points come together; every key missing from the memo is classified
+        # once, all of them in one polygon.classify_many call, and points sharing a key count as hits.
+        if hasattr(xs, 'tolist'):
+            # Plain floats hash and compare much faster than NumPy scalars
+            xs, ys = xs.tolist(), ys.tolist()
+        curve = curve or self.curve
+        order = range(len(xs)) if curve is None else space_filling_order(xs, ys, curve)
+        if hasattr(order, 'tolist'):
+            order = order.tolist()
+
+        codes = bytearray(len(xs))
+        memo = self.codes
+        quantum = self.quantum
+        pending = {}  # Indices of the points of every key missing from the memo, by key
+        hits = 0
+        for index in order:
+            if quantum:
+                key = round(xs[index] / quantum), round(ys[index] / quantum)
+            else:
+                key = xs[index], ys[index]
+            code = memo.get(key)
+            if code is not None:
+                memo.move_to_end(key)
+                codes[index] = code
+                hits += 1
+            elif key in pending:
+                pending[key].append(index)
+                hits += 1
+            else:
+                pending[key] = [index]
+
+        if pending:
+            firsts = [indices[0] for indices in pending.values()]
+            fresh = self.polygon.classify_many([xs[index] for index in firsts], [ys[index] for index in firsts])
+            for (key, indices), code in zip(pending.items(), fresh):
+                code = int(code)
+                self._remember(key, code)
+                for index in indices:
+                    codes[index] = code
+
+        self.hits += hits
+        self.misses += len(pending)
+        if INSTRUMENTATION.enabled:
+            INSTRUMENTATION.count("memo_hits", hits)
+            INSTRUMENTATION.count("memo_misses", len(pending))
+        if numpy() is not None:
+            return np.frombuffer(codes, dtype=np.uint8)
+        return array('B', codes)
+
+    def stats(self):
+        # Report the memo size and the hit rate of the queries so far
+        queries = self.hits + self.misses
+        return {
+            "entries": len(self.codes),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / queries if queries else 0.0,
+        }
+
+class PolygonLayer(Geometry):
+    # Maximum number of entries in one R-tree node
+    NODE_CAPACITY = 16
+
+    def __init__(self, polygons, ids=None, node_capacity=None):
+        # Initialize a layer of polygons, identified by ids (their positions by default), and bulk-load
+        # their MBRs into a packed R-tree
+        self.polygons = list(polygons)
+        self.ids = list(ids) if ids is not None else list(range(len(self.polygons)))
+        self.node_capacity = node_capacity or self.NODE_CAPACITY
+
+        # Widen every MBR by the tolerance so points on the boundary are still candidates
+        tolerance = Geometry.TOLERANCE
+        self.boxes = []
+        for polygon in self.polygons:
+            if polygon.bounds is None:
+                self.boxes.append(None)
+                continue
+            min_x, min_y, max_x, max_y = polygon.bounds
+            self.boxes.append((min_x - tolerance, min_y - tolerance, max_x + tolerance, max_y + tolerance))
+
+        # R-tree levels from the leaves up; every node is (min_x, min_y, max_x, max_y, children) where
+        # the children are polygon indices in the leaves and node indices of the level below otherwise
+        self.levels = []
+        entries = [box + (index,) for index, box in enumerate(self.boxes) if box is not None]
+        while entries:
+            nodes = self._pack(entries)
+            self.levels.append(nodes)
+            if len(nodes) == 1:
+                break
+            entries = [node[:4] + (index,) for index, node in enumerate(nodes)]
+
+    def _pack(self, entries):
+        # Sort-Tile-Recursive (STR) packing: sort the entries by x centre, cut them into vertical
+        # slices, sort every slice by y centre and group consecutive entries into full nodes
+        capacity = self.node_capacity
+        node_count = math.ceil(len(entries) / capacity)
+        slice_size = math.ceil(math.sqrt(node_count)) * capacity
+        entries = sorted(entries, key=lambda entry: entry[0] + entry[2])
+
+        nodes = []
+        for start in range(0, len(entries), slice_size):
+            vertical_slice = sorted(entries[start:start + slice_size], key=lambda entry: entry[1] + entry[3])
+            for group_start in range(0, len(vertical_slice), capacity):
+                group = vertical_slice[group_start:group_start + capacity]
+                nodes.append((min(entry[0] for entry in group), min(entry[1] for entry in group),
+                              max(entry[2] for entry in group), max(entry[3] for entry in group),
+                              tuple(entry[4] for entry in group)))
+        return nodes
+
+    def candidates(self, x, y):
+        # Return the indices, in ascending order, of the polygons whose widened MBR contains (x, y)
+        found = []
+        if not self.levels:
+            return found
+
+        stack = [(len(self.levels) - 1, 0)]
+        while stack:
+            level, node_index = stack.pop()
+            min_x, min_y, max_x, max_y, children = self.levels[level][node_index]
+            if not (min_x <= x <= max_x and min_y <= y <= max_y):
+                continue
+            if level > 0:
+                stack.extend((level - 1, child) for child in children)
+                continue
+            for index in children:
+                min_x, min_y, max_x, max_y = self.boxes[index]
+                if min_x <= x <= max_x and min_y <= y <= max_y:
+                    found.append(index)
+        found.sort()
+        return found
+
+    def locate(self, point):
+        # Return (polygon id, "inside" or "boundary") for the polygon containing the point, or
+        # (None, "outside"). A polygon containing the point in its interior wins over one with the
+        # point on its boundary; ties go to the polygon added first.
+        boundary_id = None
+        for index in self.candidates(point.x, point.y):
+            classification = self.polygons[index].point_in_polygon(point)
+            if classification == "inside":
+                return self.ids[index], "inside"
+            if classification == "boundary" and boundary_id is None:
+                boundary_id = self.ids[index]
+
+        if boundary_id is not None:
+            return boundary_id, "boundary"
+        return None, "outside"
+
+    def locate_many(self, xs, ys):
+        # Locate many points at once; return a list of polygon ids (None when outside every polygon)
+        # and an array of category codes, with the same preference rules as locate
+        if numpy() is None:
+            locations = [self.locate(Point(x, y)) for x, y in zip(xs, ys)]
+            return ([polygon_id for polygon_id, _ in locations],
+                    array('B', [Geometry.CATEGORIES.index(category) for _, category in locations]))
+
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+
+        # Group the points by candidate polygon so each polygon classifies its points in one batch
+        points_by_polygon = {}
+        for point_index, (x, y) in enumerate(zip(xs.tolist(), ys.tolist())):
+            for index in self.candidates(x, y):
+                points_by_polygon.setdefault(index, []).append(point_index)
+
+        codes = np.zeros(len(xs), dtype=np.uint8)
+        owners = np.full(len(xs), -1, dtype=np.int64)
+        for index in sorted(points_by_polygon):
+            point_indices = np.array(points_by_polygon[index], dtype=np.int64)
+            polygon_codes = self.polygons[index].classify_many(xs[point_indices], ys[point_indices])
+            # Take the first inside polygon, otherwise the first boundary polygon
+            current = codes[point_indices]
+            better = ((polygon_codes == Geometry.INSIDE) & (current != Geometry.INSIDE)) | \
+                     ((polygon_codes == Geometry.BOUNDARY) & (current == Geometry.OUTSIDE))
+            codes[point_indices[better]] = polygon_codes[better]
+            owners[point_indices[better]] = index
+
+        return [self.ids[owner] if owner >= 0 else None for owner in owners.tolist()], codes
+
+def pyplot():
+    # Import matplotlib.pyplot on first use, so classifying never pays for its start-up time or needs
+    # a display
+    import matplotlib.pyplot as plt
+    return plt
+
+class Plotter(Geometry):
+    # Marker colour, legend label and density colour map of every category, in legend order
+    STYLES = {
+        'outside': ('r', 'Outside', 'Reds'),
+        'boundary': ('b', 'Boundary', 'Blues'),
+        'inside': ('g', 'Inside', 'Greens'),
+        None: ('k', 'Unclassified', 'Greys'),
+    }
+    # Above this many points add_points draws density hexbins instead of individual markers
+    DENSITY_THRESHOLD = 50000
+
+    def __init__(self, title="Polygon & File Points", save_to=None):
+        # Initialize the plot with a given title; with save_to the plot is written to that file
+        # by show() instead of being displayed, so batch jobs never block on a window
+        self.save_to = save_to
+        try:
+            self.plt = pyplot()
+            self.figure = self.plt.figure()
+            self.plt.title(title)
+        except Exception as e:
+            print(f"Error in Plotter initialization: {e}")
+
+    def add_polygon(self, xs, ys):
+        try:
+            # Add a filled polygon to the plot
+            self.plt.fill(xs, ys, 'lightgray', label='Polygon')
+        except Exception as e:
+            print(f"Error in add_polygon: {e}")
+
+    def add_hole(self, xs, ys):
+        try:
+            # Cut a hole out of a filled polygon by painting it in the background colour
+            self.plt.fill(xs, ys, 'white')
+        except Exception as e:
+            print(f"Error in add_hole: {e}")
+
+    def add_triangle(self, vertices):
+        try:
+            # Add a filled triangle to the plot
+            xs, ys = zip(*[(point.x, point.y) for point in vertices])
+            self.plt.fill(xs, ys, 'lightblue', label='Triangle')
+        except Exception as e:
+            print(f"Error in add_triangle: {e}")
+    def add_square(self, mbr):
+        try:
+            # Add a filled square to the plot
+            xs, ys = zip(*[(point.x, point.y) for point in mbr])
+            self.plt.fill(xs, ys, 'lightblue', label='Square')
+        except Exception as e:
+            print(f"Errore in add_square: {e}")
+
+    def add_point(self, x, y, kind=None):
+        try:
+            # Add a point to the plot with different markers based on classification
+            if kind == 'outside':
+                self.plt.plot(x, y, 'ro', label='Outside')
+            elif kind == 'boundary':
+                self.plt.plot(x, y, 'bo', label='Boundary')
+            elif kind == 'inside':
+                self.plt.plot(x, y, 'go', label='Inside')
+            else:
+                self.plt.plot(x, y, 'ko', label='Unclassified')
+        except Exception as e:
+            print(f"Error in add_point: {e}")
+
+    def add_points(self, xs, ys, kinds=None, density=None):
+        try:
+            # Add many points with one scatter per category instead of one artist per point.
+            # kinds holds category labels or codes (None for unclassified points). With density,
+            # which defaults to True above DENSITY_THRESHOLD points, every category is drawn as a
+            # hexbin density map instead.
+            if density is None:
+                density = len(xs) > self.DENSITY_THRESHOLD
+            for kind, (group_xs, group_ys) in self._group_by_category(xs, ys, kinds).items():
+                color, label, cmap = self.STYLES[kind]
+                if density:
+                    self.plt.hexbin(group_xs, group_ys, gridsize=200, cmap=cmap, mincnt=1)
+                    # Empty scatter so the legend shows the category colour
+                    self.plt.scatter([], [], c=color, s=36, label=label)
+                else:
+                    self.plt.scatter(group_xs, group_ys, c=color, s=36, label=label)
+        except Exception as e:
+            print(f"Error in add_points: {e}")
+
+    def _group_by_category(self, xs, ys, kinds):
+        # Split the coordinates into per-category (xs, ys) pairs, in legend order
+        if kinds is None:
+            return {None: (xs, ys)}
+        categories = [kind for kind in self.STYLES if kind is not None]
+
+        if numpy() is not None:
+            xs, ys, kinds = np.asarray(xs), np.asarray(ys), np.asarray(kinds)
+            if kinds.dtype.kind in 'iu':
+                # Category codes
+                kinds = np.array(Geometry.CATEGORIES)[kinds]
+            groups = {}
+            classified = np.zeros(len(kinds), dtype=bool)
+            for kind in categories:
+                mask = kinds == kind
+                classified |= mask
+                if mask.any():
+                    groups[kind] = (xs[mask], ys[mask])
+            if not classified.all():
+                groups[None] = (xs[~classified], ys[~classified])
+            return groups
+
+        groups = {}
+        for x, y, kind in zip(xs, ys, kinds):
+            if isinstance(kind, int):
+                kind = Geometry.CATEGORIES[kind]
+            group_xs, group_ys = groups.setdefault(kind if kind in categories else None, ([], []))
+            group_xs.append(x)
+            group_ys.append(y)
+        return {kind: groups[kind] for kind in self.STYLES if kind in groups}
+
+    def show(self):
+        try:
+            # Display the legend, set axis labels, and show (or save) the plot
+            handles, labels = self.plt.gca().get_legend_handles_labels()
+            by_label = OrderedDict(zip(labels, handles))
+            self.plt.legend(by_label.values(), by_label.keys())
+            self.plt.xlabel('X-axis')
+            self.plt.ylabel('Y-axis')
+            if self.save_to:
+                self.figure.savefig(self.save_to)
+                self.plt.close(self.figure)
+            else:
+                self.plt.show()
+        except Exception as e:
+            print(f"Error in show: {e}")
+
+def read_coordinates_from_file(filename):
+    # Read x, y coordinates from a CSV file into a PointArray
+    try:
+        coordinates = PointArray()
+        with INSTRUMENTATION.stage("read_csv") as stage, open(filename, 'r') as file:
+            next(file)  # Skip the header line
+            for id, line in enumerate(file, start=1):
+                values = line.strip().split(',')
+
+                try:
+                    # Extract and convert x and y values from the line
+                    x = float(values[1])
+                    y = float(values[2])
+                    coordinates.append(Point(x, y))
+                except (ValueError, TypeError) as e:
+                    # Handle errors during conversion, use default values (0, 0)
+                    print(f"Error reading coordinates for id {id}: {e}. Using default values.")
+                    coordinates.append(Point(0, 0))
+            stage.items = len(coordinates)
+
+        return coordinates
+    except FileNotFoundError as e:
+        # Handle file not found error
+        print(f"Error in read_coordinates_from_file: {e}")
+        return PointArray()
+
+
+def write_results_to_file(filename, classifications):
+    try:
+        with INSTRUMENTATION.stage("write_csv", len(classifications)), open(filename, 'w') as file:
+            file.write("id,category\n")
+            for id, cls in enumerate(classifications, start=1):
+                # Write ID and classification to the file
+                file.write(f"{id},{cls}\n")
+    except Exception as e:
+        # Handle general writing error
+        print(f"Error in write_results_to_file: {e}")
+
+# Number of points read, classified and written at a time by the streaming pipeline
+CHUNK_SIZE = 1 << 16
+
+def read_coordinate_chunks(filename, chunk_size=CHUNK_SIZE):
+    # Read x, y coordinates from a CSV file in chunks, yielding (xs, ys) arrays of up to chunk_size
+    # values so memory stays constant whatever the file size
+    try:
+        with open(filename, 'r') as file:
+            next(file)  # Skip the header line
+            xs, ys = array('d'), array('d')
+            for id, line in enumerate(file, start=1):
+                values = line.strip().split(',')
+
+                try:
+                    # Extract and convert x and y values from the line
+                    x = float(values[1])
+                    y = float(values[2])
+                except (ValueError, TypeError) as e:
+                    # Handle errors during conversion, use default values (0, 0)
+                    print(f"Error reading coordinates for id {id}: {e}. Using default values.")
+                    x, y = 0.0, 0.0
+                xs.append(x)
+                ys.append(y)
+
+                if len(xs) == chunk_size:
+                    yield xs, ys
+                    xs, ys = array('d'), array('d')
+
+            if xs:
+                yield xs, ys
+    except FileNotFoundError as e:
+        # Handle file not found error
+        print(f"Error in read_coordinate_chunks: {e}")
+
+def peek_chunks(chunks):
+    # Read the first chunk ahead and return the chunks again, or None when there are none (a missing
+    # or empty points file), so that no output file is created or truncated for an empty input
+    first = next(chunks, None)
+    if first is None or not len(first[0]):
+        return None
+    return itertools.chain([first], chunks)
+
+class ResultWriter:
+    # Writes id,category rows incrementally, one chunk of category codes at a time
+    def __init__(self, filename, buffer_size=1 << 20):
+        # Open the output file with a large write buffer and write the header
+        self.file = open(filename, 'w', buffering=buffer_size)
+        self.file.write("id,category\n")
+        self.next_id = 1
+        self.suffixes = [f",{category}\n" for category in Geometry.CATEGORIES]
+
+    def write(self, codes):
+        # Append one row per category code, numbering the rows after the ones already written
+        suffixes = self.suffixes
+        self.file.write("".join([f"{id}{suffixes[code]}" for id, code in enumerate(codes, start=self.next_id)]))
+        self.next_id += len(codes)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+# Polygon held by each worker process of the parallel classifier, set once by _init_worker
+_worker_polygon = None
+
+def _init_worker(polygon):
+    # Pool initializer: keep the polygon in the worker so it is shipped once, not with every chunk
+    global _worker_polygon
+    _worker_polygon = polygon
+
+def _classify_chunk(chunk):
+    # Classify one (xs, ys) chunk in a worker process
+    xs, ys = chunk
+    return _worker_polygon.classify_many(xs, ys)
+
+def resolve_workers(workers):
+    # Number of worker processes to use; 0 or None means one per CPU core
+    return workers or os.cpu_count() or 1
+
+def classify_chunks(polygon, chunks, workers=1):
+    # Classify an iterable of (xs, ys) chunks, yielding the category codes of each chunk in input order.
+    # With more than one worker the chunks are spread over a process pool.
+    workers = resolve_workers(workers)
+    if workers == 1:
+        for xs, ys in chunks:
+            yield polygon.classify_many(xs, ys)
+        return
+
+    with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(polygon,)) as pool:
+        # imap keeps the input order and only keeps a few chunks in flight
+        yield from pool.imap(_classify_chunk, chunks)
+
+def classify_parallel(polygon, xs, ys, workers=None, chunk_size=CHUNK_SIZE):
+    # Classify the points with a process pool (one worker per core by default) and return the
+    # category codes in input order, as Polygon.classify_many would
+    chunks = ((xs[start:start + chunk_size], ys[start:start + chunk_size])
+              for start in range(0, len(xs), chunk_size))
+    results = list(classify_chunks(polygon, chunks, workers))
+    if numpy() is None:
+        codes = array('B')
+        for chunk_codes in results:
+            codes.extend(chunk_codes)
+        return codes
+    return np.concatenate(results) if results else np.zeros(0, dtype=np.uint8)
+
+def classify_file(polygon, points_filename, output_filename, chunk_size=CHUNK_SIZE, workers=1):
+    # Stream the points of a CSV file through the polygon's batch classifier into an id,category
+    # CSV file, chunk by chunk, using the given number of worker processes. Returns the number of
+    # points classified.
+    try:
+        chunks = peek_chunks(read_coordinate_chunks(points_filename, chunk_size))
+        if chunks is None:
+            return 0
+        with ResultWriter(output_filename) as writer:
+            for codes in classify_chunks(polygon, chunks, workers):
+                writer.write(codes)
+            return writer.next_id - 1
+    except Exception as e:
+        # Handle general reading or writing error
+        print(f"Error in classify_file: {e}")
+        return 0
+
+class WideResultWriter(ResultWriter):
+    # Writes one id,<shape>,<shape>,... row per point, with the category of the point for every shape
+    def __init__(self, filename, names, buffer_size=1 << 20):
+        self.file = open(filename, 'w', buffering=buffer_size)
+        self.file.write(",".join(["id"] + list(names)) + "\n")
+        self.next_id = 1
+
+    def write(self, columns):
+        # Append the rows of one chunk, given as one array of category codes per shape
+        categories = Geometry.CATEGORIES
+        rows = zip(*[codes.tolist() if hasattr(codes, 'tolist') else codes for codes in columns])
+        self.file.write("".join([f"{id}," + ",".join([categories[code] for code in row]) + "\n"
+                                 for id, row in enumerate(rows, start=self.next_id)]))
+        self.next_id += len(columns[0]) if columns else 0
+
+class ShapeSet:
+    # Named shapes (anything with bounds and classify_many: Polygon, Triangle, Square, PolygonGrid,
+    # ClassificationMemo, ...) classified together in one pass over the points. Each shape only sees
+    # the points inside its MBR, widened so that no point it rejects could be on its boundary or
+    # inside it within tolerance (the barycentric tolerance of Triangle grows with its size); the
+    # others are outside without further work.
+    def __init__(self):
+        self.names = []
+        self.shapes = []
+        self.bounds = []  # Widened MBR of each shape
+
+    def add(self, name, shape):
+        # Register a shape; its results come after those of the shapes added before it
+        if name in self.names:
+            raise ValueError(f"a shape named {name!r} is already registered")
+        min_x, min_y, max_x, max_y = shape.bounds
+        margin = 2 * Geometry.TOLERANCE * (1 + (max_x - min_x) + (max_y - min_y))
+        self.names.append(name)
+        self.shapes.append(shape)
+        self.bounds.append((min_x - margin, min_y - margin, max_x + margin, max_y + margin))
+
+    def __len__(self):
+        return len(self.shapes)
+
+    @staticmethod
+    def count_rejects(shape, rejects):
+        # Polygons (also behind a memo) count the MBR tests of the points they are given, so the
+        # points rejected before reaching them are counted here to keep the MBR reject rate of the
+        # whole input
+        if INSTRUMENTATION.enabled and rejects and isinstance(shape, (Polygon, ClassificationMemo)):
+            INSTRUMENTATION.count("mbr_tests", rejects)
+            INSTRUMENTATION.count("mbr_rejects", rejects)
+
+    def classify_many(self, xs, ys):
+        # Classify the points against every shape and return one array of category codes per shape
+        count = len(xs)
+        columns = []
+        if numpy() is not None:
+            xs = np.asarray(xs, dtype=np.float64)
+            ys = np.asarray(ys, dtype=np.float64)
+            for shape, (min_x, min_y, max_x, max_y) in zip(self.shapes, self.bounds):
+                codes = np.zeros(count, dtype=np.uint8)
+                candidates = np.flatnonzero((xs >= min_x) & (xs <= max_x) & (ys >= min_y) & (ys <= max_y))
+                self.count_rejects(shape, count - len(candidates))
+                if len(candidates):
+                    codes[candidates] = shape.classify_many(xs[candidates], ys[candidates])
+                columns.append(codes)
+            return columns
+
+        for shape, (min_x, min_y, max_x, max_y) in zip(self.shapes, self.bounds):
+            codes = array('B', bytes(count))
+            candidates = [i for i in range(count) if min_x <= xs[i] <= max_x and min_y <= ys[i] <= max_y]
+            self.count_rejects(shape, count - len(candidates))
+            if candidates:
+                found = shape.classify_many([xs[i] for i in candidates], [ys[i] for i in candidates])
+                for i, code in zip(candidates, found):
+                    codes[i] = code
+            columns.append(codes)
+        return columns
+
+    def classify_points(self, xs, ys, workers=1, chunk_size=CHUNK_SIZE):
+        # Classify points held in memory chunk by chunk (over a process pool when workers > 1) and
+        # return one array of category codes per shape, in input order
+        chunks = ((xs[start:start + chunk_size], ys[start:start + chunk_size])
+                  for start in range(0, len(xs), chunk_size))
+        parts = [[] for _ in self.shapes]
+        for chunk_columns in classify_chunks(self, chunks, workers):
+            for part, codes in zip(parts, chunk_columns):
+                part.append(codes)
+        if numpy() is not None:
+            return [np.concatenate(part) if part else np.zeros(0, dtype=np.uint8) for part in parts]
+        columns = []
+        for part in parts:
+            codes = array('B')
+            for chunk_codes in part:
+                codes.extend(chunk_codes)
+            columns.append(codes)
+        return columns
+
+    def classify_file(self, points_filename, output_filenames=None, wide_filename=None, chunk_size=CHUNK_SIZE,
+                      workers=1, binary=False):
+        # Stream the points of a CSV or binary point file once through every shape, writing an
+        # id,category file per shape (output_filenames maps shape names to files; shapes left out are
+        # not written; binary=True writes binary category files instead) and/or one wide
+        # id,<shape>,... CSV file. Returns the number of points classified.
+        writers = []
+        wide = None
+        try:
+            chunks = peek_chunks(read_point_chunks(points_filename, chunk_size, workers))
+            if chunks is None:
+                return 0
+            writer_class = BinaryResultWriter if binary else ResultWriter
+            for name in self.names:
+                filename = (output_filenames or {}).get(name)
+                writers.append(writer_class(filename) if filename else None)
+            if wide_filename:
+                wide = WideResultWriter(wide_filename, self.names)
+            count = 0
+            for columns in classify_chunks(self, chunks, workers):
+                for writer, codes in zip(writers, columns):
+                    if writer:
+                        writer.write(codes)
+                if wide:
+                    wide.write(columns)
+                count += len(columns[0]) if columns else 0
+            return count
+        except Exception as e:
+            # Handle general reading or writing error
+            print(f"Error in ShapeSet.classify_file: {e}")
+            return 0
+        finally:
+            for writer in writers + [wide]:
+                if writer:
+                    writer.close()
+
+# Binary columnar point files: a 16-byte header (magic, version, column flags, point count) followed
+# by raw little-endian columns, first x and y as float64 (when BINARY_POINTS is set), then the
+# category codes as uint8 (when BINARY_CATEGORIES is set)
+BINARY_HEADER = struct.Struct('<4sHHQ')
+BINARY_MAGIC = b'PIPC'
+BINARY_VERSION = 1
+BINARY_POINTS, BINARY_CATEGORIES = 1, 2
+
+def is_binary_file(filename):
+    # Check whether a file starts with the binary point file magic
+    with open(filename, 'rb') as file:
+        return file.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+def _float_column_bytes(values):
+    # Return a sequence of floats as raw little-endian float64 bytes
+    if numpy() is not None:
+        return np.asarray(values, dtype='<f8').tobytes()
+    column = array('d', values)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column.tobytes()
+
+def _float_column_view(mapping, offset, count):
+    # Return a zero-copy float64 view of count values starting at offset in a memory map
+    if numpy() is not None:
+        return np.frombuffer(mapping, dtype='<f8', count=count, offset=offset)
+    if sys.byteorder == 'big':
+        # Big-endian hosts need a byte-swapped copy
+        column = array('d', mapping[offset:offset + 8 * count])
+        column.byteswap()
+        return column
+    return memoryview(mapping)[offset:offset + 8 * count].cast('d')
+
+def read_binary_points(filename):
+    # Memory-map a binary point file and return (xs, ys, codes) as zero-copy views of the file;
+    # columns that are not in the file are None
+    try:
+        with open(filename, 'rb') as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, columns, count = BINARY_HEADER.unpack_from(mapping)
+        if magic != BINARY_MAGIC or version != BINARY_VERSION:
+            print(f"Error in read_binary_points: {filename} is not a version {BINARY_VERSION} binary point file.")
+            return None, None, None
+
+        xs = ys = codes = None
+        offset = BINARY_HEADER.size
+        if columns & BINARY_POINTS:
+            xs = _float_column_view(mapping, offset, count)
+            ys = _float_column_view(mapping, offset + 8 * count, count)
+            offset += 16 * count
+        if columns & BINARY_CATEGORIES:
+            codes = memoryview(mapping)[offset:offset + count]
+        return xs, ys, codes
+    except (FileNotFoundError, ValueError, struct.error) as e:
+        # Handle missing, empty or truncated files
+        print(f"Error in read_binary_points: {e}")
+        return None, None, None
+
+def write_binary_points(filename, xs=None, ys=None, codes=None):
+    # Write x/y coordinates and/or category codes to a binary point file
+    try:
+        columns = (BINARY_POINTS if xs is not None else 0) | (BINARY_CATEGORIES if codes is not None else 0)
+        count = len(xs) if xs is not None else len(codes)
+        with open(filename, 'wb') as file:
+            file.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, columns, count))
+            for column in (xs, ys):
+                if column is not None:
+                    for start in range(0, count, CHUNK_SIZE):
+                        file.write(_float_column_bytes(column[start:start + CHUNK_SIZE]))
+            if codes is not None:
+                file.write(bytes(codes))
+    except Exception as e:
+        # Handle general writing error
+        print(f"Error in write_binary_points: {e}")
+
+class BinaryResultWriter(ResultWriter):
+    # Writes category codes incrementally to a binary point file; the point count in the header is
+    # filled in when the writer is closed
+    def __init__(self, filename):
+        self.file = open(filename, 'wb')
+        self.file.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, BINARY_CATEGORIES, 0))
+        self.next_id = 1
+
+    def write(self, codes):
+        # Append the category codes of one chunk
+        self.file.write(bytes(codes))
+        self.next_id += len(codes)
+
+    def close(self):
+        self.file.seek(0)
+        self.file.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, BINARY_CATEGORIES, self.next_id - 1))
+        self.file.close()
+
+def read_binary_chunks(filename, chunk_size=CHUNK_SIZE):
+    # Yield (xs, ys) chunks of a binary point file as zero-copy slices of the memory map
+    xs, ys, _ = read_binary_points(filename)
+    if xs is None:
+        return
+    for start in range(0, len(xs), chunk_size):
+        yield xs[start:start + chunk_size], ys[start:start + chunk_size]
+
+def read_point_chunks(filename, chunk_size=CHUNK_SIZE, workers=1):
+    # Yield (xs, ys) chunks of a binary point file or of an id,x,y CSV file, told apart by the binary
+    # magic, ready to be classified by the given number of worker processes
+    if not (os.path.isfile(filename) and is_binary_file(filename)):
+        return read_coordinate_chunks(filename, chunk_size)
+    chunks = read_binary_chunks(filename, chunk_size)
+    if resolve_workers(workers) > 1 and numpy() is None:
+        # Memoryview slices cannot be sent to worker processes, so copy each chunk
+        chunks = ((array('d', xs), array('d', ys)) for xs, ys in chunks)
+    return chunks
+
+def classify_binary_file(polygon, points_filename, output_filename, chunk_size=CHUNK_SIZE, workers=1):
+    # Classify the points of a binary point file into a binary file of category codes, chunk by chunk.
+    # Returns the number of points classified.
+    try:
+        chunks = peek_chunks(read_point_chunks(points_filename, chunk_size, workers))
+        if chunks is None:
+            return 0
+        with BinaryResultWriter(output_filename) as writer:
+            for codes in classify_chunks(polygon, chunks, workers):
+                writer.write(codes)
+            return writer.next_id - 1
+    except Exception as e:
+        # Handle general reading or writing error
+        print(f"Error in classify_binary_file: {e}")
+        return 0
+
+def convert_csv_to_binary(csv_filename, binary_filename):
+    # Convert an id,x,y points CSV (like input.csv) or an id,category results CSV (like output.csv)
+    # to a binary point file. Returns the number of rows converted.
+    with open(csv_filename, 'r') as file:
+        header = file.readline().strip()
+
+    if header == "id,category":
+        codes = bytearray()
+        with open(csv_filename, 'r') as file:
+            next(file)  # Skip the header line
+            for line in file:
+                if line.strip():
+                    codes.append(Geometry.CATEGORIES.index(line.strip().split(',')[1]))
+        write_binary_points(binary_filename, codes=codes)
+        return len(codes)
+
+    # Stream the x column straight into the file and park the y column in a temporary file
+    count = 0
+    with open(binary_filename, 'wb') as file, tempfile.TemporaryFile() as y_file:
+        file.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, BINARY_POINTS, 0))
+        for xs, ys in read_coordinate_chunks(csv_filename):
+            file.write(_float_column_bytes(xs))
+            y_file.write(_float_column_bytes(ys))
+            count += len(xs)
+        y_file.seek(0)
+        shutil.copyfileobj(y_file, file)
+        file.seek(0)
+        file.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, BINARY_POINTS, count))
+    return count
+
+def convert_binary_to_csv(binary_filename, csv_filename):
+    # Convert a binary point file back to CSV: id,category when it holds category codes, id,x,y
+    # otherwise. Returns the number of rows converted.
+    xs, ys, codes = read_binary_points(binary_filename)
+    if codes is not None:
+        with ResultWriter(csv_filename) as writer:
+            for start in range(0, len(codes), CHUNK_SIZE):
+                writer.write(codes[start:start + CHUNK_SIZE])
+        return len(codes)
+    if xs is None:
+        return 0
+
+    with open(csv_filename, 'w', buffering=1 << 20) as file:
+        file.write("id,x,y\n")
+        for start in range(0, len(xs), CHUNK_SIZE):
+            rows = zip(range(start + 1, start + CHUNK_SIZE + 1), xs[start:start + CHUNK_SIZE].tolist(),
+                       ys[start:start + CHUNK_SIZE].tolist())
+            file.write("".join([f"{id},{x!r},{y!r}\n" for id, x, y in rows]))
+    return len(xs)
+
+def _int_column_bytes(values):
+    # Return a sequence of integers as raw little-endian int64 bytes
+    if numpy() is not None:
+        return np.asarray(values, dtype='<i8').tobytes()
+    column = array('q', values)
+    if sys.byteorder == 'big':
+        column.byteswap()
+    return column.tobytes()
+
+def _int_column_view(mapping, offset, count):
+    # Return a zero-copy int64 view of count values starting at offset in a memory map
+    if numpy() is not None:
+        return np.frombuffer(mapping, dtype='<i8', count=count, offset=offset)
+    if sys.byteorder == 'big':
+        # Big-endian hosts need a byte-swapped copy
+        column = array('q', mapping[offset:offset + 8 * count])
+        column.byteswap()
+        return column
+    return memoryview(mapping)[offset:offset + 8 * count].cast('q')
+
+# Prepared polygon cache files: a header (magic, version, flags, orientation, edge count, slab count,
+# slab index entries, grid columns and rows) followed by the eight edge columns as float64, the slab
+# index offsets and edge ids as int64 (when CACHE_SLABS is set) and the grid cell labels as uint8
+# (when CACHE_GRID is set)
+CACHE_HEADER = struct.Struct('<4sHHhQQQQQ')
+CACHE_MAGIC = b'PIPX'
+CACHE_VERSION = 2
+CACHE_CONVEX, CACHE_SLABS, CACHE_GRID = 1, 2, 4
+
+class PolygonCache:
+    # Directory of prepared polygons (MBR, edges, slab index and grid) keyed by a hash of their
+    # vertices. Entries are memory-mapped on later runs: the NumPy paths and the grid use the mapped
+    # columns as they are, while the edge tuples and slab lists of the scalar paths are read from
+    # them in one pass. The least recently used entries are evicted once the directory holds more
+    # than max_bytes.
+    SUFFIX = '.pipx'
+
+    def __init__(self, directory, max_bytes=256 << 20):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0  # Polygons loaded from the cache
+        self.misses = 0  # Polygons built and saved
+        os.makedirs(directory, exist_ok=True)
+
+    def path_of(self, points):
+        # Return the cache file of a polygon: the SHA-256 of its coordinates, the format version and
+        # the tolerance the index was built with, so changed vertices or settings never match
+        xs, ys = coordinates_of(points)
+        digest = hashlib.sha256(CACHE_MAGIC + struct.pack('<Hd', CACHE_VERSION, Geometry.TOLERANCE))
+        digest.update(_float_column_bytes(xs))
+        digest.update(_float_column_bytes(ys))
+        return os.path.join(self.directory, digest.hexdigest() + self.SUFFIX)
+
+    def prepare(self, points, index=True, slab_count=None, grid_columns=None, grid_rows=None):
+        # Return (polygon, grid) for the vertices, loaded from the cache when an entry with the same
+        # settings exists, otherwise built and saved. The polygon gets a slab index when index is set
+        # (slab_count slabs, or the build_index default); grid is None unless grid_columns is given.
+        path = self.path_of(points)
+        prepared = self.load(path, points, index, slab_count, grid_columns, grid_rows)
+        if prepared is not None:
+            self.hits += 1
+            return prepared
+
+        self.misses += 1
+        polygon = Polygon(points)
+        if index:
+            polygon.build_index(slab_count)
+        grid = PolygonGrid(polygon, grid_columns, grid_rows) if grid_columns else None
+        if polygon.edges:
+            self.save(path, polygon, grid)
+            self.evict()
+        return polygon, grid
+
+    def load(self, path, points, index=True, slab_count=None, grid_columns=None, grid_rows=None):
+        # Memory-map a cache entry and rebuild the polygon and grid from it. Returns None when there is
+        # no entry, or when it is damaged or was saved with other settings.
+        try:
+            with open(path, 'rb') as file:
+                mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, flags, orientation, n, slabs, entries, columns, rows = \
+                CACHE_HEADER.unpack_from(mapping)
+        except (FileNotFoundError, ValueError, struct.error):
+            # Missing, empty or truncated entry
+            return None
+
+        has_slabs, has_grid = flags & CACHE_SLABS, flags & CACHE_GRID
+        size = (CACHE_HEADER.size + 64 * n + (8 * (slabs + 1 + entries) if has_slabs else 0) +
+                (columns * rows if has_grid else 0))
+        if magic != CACHE_MAGIC or version != CACHE_VERSION or n != len(points) or len(mapping) != size:
+            return None
+        if index and not has_slabs or slab_count and slab_count != slabs:
+            return None
+        if grid_columns and not (has_grid and columns == grid_columns and grid_rows in (None, rows)):
+            return None
+
+        # The edge tuples of the scalar paths are read from the mapped columns, which classify_many
+        # then uses as they are
+        offset = CACHE_HEADER.size
+        columns_of_edges = [_float_column_view(mapping, offset + 8 * n * k, n) for k in range(8)]
+        edges = list(zip(*[column.tolist() for column in columns_of_edges]))
+        offset += 64 * n
+        slab_offsets = slab_edge_ids = None
+        if has_slabs:
+            # The slabs are skipped, not restored, when the caller asked for no index
+            if index:
+                slab_offsets = _int_column_view(mapping, offset, slabs + 1)
+                slab_edge_ids = _int_column_view(mapping, offset + 8 * (slabs + 1), entries)
+            offset += 8 * (slabs + 1 + entries)
+        polygon = Polygon.from_prepared(points, edges, orientation, bool(flags & CACHE_CONVEX),
+                                        slabs if index and has_slabs else None, slab_offsets, slab_edge_ids)
+        if numpy() is not None:
+            polygon._edge_arrays = tuple(columns_of_edges)
+        grid = None
+        if grid_columns:
+            grid = PolygonGrid(polygon, columns, rows, cells=memoryview(mapping)[offset:offset + columns * rows])
+
+        # Mark the entry as recently used for the eviction order
+        os.utime(path)
+        return polygon, grid
+
+    def save(self, path, polygon, grid=None):
+        # Write the prepared polygon (and grid) to a cache entry. The entry is written to a temporary
+        # file first, so other processes never map a half-written entry.
+        temporary = None
+        try:
+            flags = CACHE_CONVEX if polygon.convex else 0
+            slabs = entries = columns = rows = 0
+            if polygon.slabs is not None:
+                flags |= CACHE_SLABS
+                slabs = polygon.slab_count
+                entries = sum(len(ids) for ids in polygon._slab_edge_ids)
+            if grid is not None:
+                flags |= CACHE_GRID
+                columns, rows = grid.columns, grid.rows
+
+            with tempfile.NamedTemporaryFile('wb', dir=self.directory, suffix='.tmp', delete=False) as file:
+                temporary = file.name
+                file.write(CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, flags, polygon.orientation,
+                                             len(polygon.edges), slabs, entries, columns, rows))
+                for column in zip(*polygon.edges):
+                    file.write(_float_column_bytes(column))
+                if polygon.slabs is not None:
+                    offsets = [0]
+                    for ids in polygon._slab_edge_ids:
+                        offsets.append(offsets[-1] + len(ids))
+                    file.write(_int_column_bytes(offsets))
+                    file.write(_int_column_bytes([i for ids in polygon._slab_edge_ids for i in ids]))
+                if grid is not None:
+                    file.write(grid.cells)
+            os.replace(temporary, path)
+        except Exception as e:
+            # A cache that cannot be written only costs the rebuild next time
+            print(f"Error in PolygonCache.save: {e}")
+            if temporary and os.path.exists(temporary):
+                os.remove(temporary)
+
+    def evict(self):
+        # Remove the least recently used entries until the cache fits in max_bytes, always keeping
+        # the most recent one
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith(self.SUFFIX):
+                path = os.path.join(self.directory, name)
+                try:
+                    status = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((status.st_mtime_ns, status.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+def read_polygons_from_file(filename):
+    # Read a polygon layer from a CSV file with a polygon_id,x,y header; the vertices of each polygon
+    # are listed in order and grouped by polygon_id. Returns the list of ids and the list of Polygons.
+    try:
+        vertices_by_id = {}
+        with open(filename, 'r') as file:
+            next(file)  # Skip the header line
+            for line_number, line in enumerate(file, start=2):
+                values = line.strip().split(',')
+                if not values[0]:
+                    continue
+
+                try:
+                    # Extract and convert x and y values from the line
+                    point = Point(float(values[1]), float(values[2]))
+                except (ValueError, TypeError, IndexError) as e:
+                    # Skip the vertex rather than distorting the polygon
+                    print(f"Error reading vertex on line {line_number}: {e}. Skipping it.")
+                    continue
+                vertices_by_id.setdefault(values[0], PointArray()).append(point)
+
+        ids = list(vertices_by_id)
+        return ids, [Polygon(vertices_by_id[polygon_id]) for polygon_id in ids]
+    except FileNotFoundError as e:
+        # Handle file not found error
+        print(f"Error in read_polygons_from_file: {e}")
+        return [], []
+
+# Header of polygon files whose vertices carry part and ring ids (see read_multipolygon_from_file)
+RING_HEADER = "part_id,ring_id,x,y"
+
+def is_ring_file(filename):
+    # Check whether a polygon file has part and ring ids
+    try:
+        with open(filename, 'r') as file:
+            return file.readline().strip() == RING_HEADER
+    except FileNotFoundError:
+        return False
+
+def read_multipolygon_from_file(filename):
+    # Read a MultiPolygon from a CSV file with a part_id,ring_id,x,y header. The vertices of each ring
+    # are listed in order and grouped by (part_id, ring_id); the first ring of each part is its outer
+    # ring and the others are its holes. Returns None if the file has no vertices.
+    try:
+        rings_by_part = {}
+        with open(filename, 'r') as file:
+            next(file)  # Skip the header line
+            for line_number, line in enumerate(file, start=2):
+                values = line.strip().split(',')
+                if not values[0]:
+                    continue
+
+                try:
+                    # Extract and convert x and y values from the line
+                    point = Point(float(values[2]), float(values[3]))
+                except (ValueError, TypeError, IndexError) as e:
+                    # Skip the vertex rather than distorting the ring
+                    print(f"Error reading vertex on line {line_number}: {e}. Skipping it.")
+                    continue
+                rings = rings_by_part.setdefault(values[0], {})
+                rings.setdefault(values[1], PointArray()).append(point)
+
+        if not rings_by_part:
+            return None
+        parts = []
+        for rings in rings_by_part.values():
+            outer, *holes = rings.values()
+            parts.append(Polygon(outer, holes))
+        return MultiPolygon(parts)
+    except FileNotFoundError as e:
+        # Handle file not found error
+        print(f"Error in read_multipolygon_from_file: {e}")
+        return None
+
+def write_locations_to_file(filename, polygon_ids, classifications):
+    try:
+        with open(filename, 'w') as file:
+            file.write("id,polygon_id,category\n")
+            for id, (polygon_id, cls) in enumerate(zip(polygon_ids, classifications), start=1):
+                # Write ID, containing polygon (empty when outside) and classification to the file
+                file.write(f"{id},{'' if polygon_id is None else polygon_id},{cls}\n")
+    except Exception as e:
+        # Handle general writing error
+        print(f"Error in write_locations_to_file: {e}")
@@ -0,0 +1,114 @@
+import os
+
+from benchmark import generate_convex_polygon, generate_points, generate_star_polygon
+from point_in_polygon import CACHE_HEADER, PolygonCache, Polygon
+
+
+def entries(directory):
+    return sorted(name for name in os.listdir(directory) if name.endswith(PolygonCache.SUFFIX))
+
+
+def assert_same_answers(polygon, built):
+    xs, ys = zip(*[(point.x, point.y) for point in generate_points(500, built.bounds, seed=0)])
+    assert list(polygon.classify_many(xs, ys)) == list(built.classify_many(xs, ys))
+
+
+def test_store_and_hit(tmp_path):
+    points = generate_star_polygon(100, seed=0)
+    cache = PolygonCache(str(tmp_path))
+    built, _ = cache.prepare(points)
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert entries(tmp_path) == [os.path.basename(cache.path_of(points))]
+
+    # A later run maps the entry instead of rebuilding the polygon
+    cache = PolygonCache(str(tmp_path))
+    polygon, grid = cache.prepare(points)
+    assert (cache.hits, cache.misses) == (1, 0)
+    assert grid is None
+    assert polygon.edges == built.edges
+    assert polygon.slab_count == built.slab_count
+    assert polygon.slabs == built.slabs
+    assert_same_answers(polygon, built)
+
+
+def test_load_without_index(tmp_path):
+    # An entry saved with a slab index gives a polygon without one when no index is asked for
+    points = generate_star_polygon(100, seed=0)
+    cache = PolygonCache(str(tmp_path))
+    built, _ = cache.prepare(points)
+    polygon, _ = cache.prepare(points, index=False)
+    assert cache.hits == 1
+    assert polygon.slabs is None and polygon.slab_count is None
+    assert_same_answers(polygon, built)
+
+
+def test_grid_round_trip(tmp_path):
+    points = generate_star_polygon(100, seed=0)
+    cache = PolygonCache(str(tmp_path))
+    _, built = cache.prepare(points, grid_columns=16, grid_rows=16)
+    _, grid = cache.prepare(points, grid_columns=16, grid_rows=16)
+    assert cache.hits == 1
+    assert bytes(grid.cells) == bytes(built.cells)
+
+
+def test_version_mismatch_rebuilds(tmp_path):
+    points = generate_star_polygon(100, seed=0)
+    cache = PolygonCache(str(tmp_path))
+    cache.prepare(points)
+    path = cache.path_of(points)
+    with open(path, 'r+b') as file:
+        # Overwrite the format version that follows the magic
+        file.seek(4)
+        file.write((0).to_bytes(2, 'little'))
+    assert cache.load(path, points) is None
+
+    polygon, _ = cache.prepare(points)
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert cache.load(path, points) is not None
+    assert_same_answers(polygon, Polygon(points))
+
+
+def test_damaged_entry_rebuilds(tmp_path):
+    points = generate_star_polygon(100, seed=0)
+    cache = PolygonCache(str(tmp_path))
+    cache.prepare(points)
+    path = cache.path_of(points)
+    with open(path, 'r+b') as file:
+        file.truncate(CACHE_HEADER.size + 10)
+    cache.prepare(points)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_eviction_keeps_recent_entries(tmp_path):
+    polygons = [generate_star_polygon(100, seed=seed) for seed in range(4)]
+    cache = PolygonCache(str(tmp_path))
+    cache.prepare(polygons[0])
+    entry_size = os.path.getsize(cache.path_of(polygons[0]))
+
+    # Room for two entries: each new entry evicts the least recently used one
+    cache.max_bytes = 2 * entry_size
+    cache.prepare(polygons[1])
+    os.utime(cache.path_of(polygons[0]), ns=(1, 1))
+    cache.prepare(polygons[2])
+    assert entries(tmp_path) == sorted(os.path.basename(cache.path_of(points)) for points in polygons[1:3])
+
+    # The most recent entry is kept even when it alone is over the limit
+    cache.max_bytes = 0
+    cache.prepare(polygons[3])
+    assert entries(tmp_path) == [os.path.basename(cache.path_of(polygons[3]))]
+
+
+def test_convex_round_trip(tmp_path):
+    # A polygon stored as convex skips the convexity check and gets the same chains back
+    points = generate_convex_polygon(40, seed=0)
+    cache = PolygonCache(str(tmp_path))
+    built, _ = cache.prepare(points, index=False)
+    assert built.convex
+    polygon, _ = cache.prepare(points, index=False)
+    assert cache.hits == 1
+    assert polygon.convex
+    assert polygon.chains == built.chains
+    assert_same_answers(polygon, built)
+    for point in generate_points(200, built.bounds, seed=1):
+        assert polygon.classify_convex(point.x, point.y) == Polygon.classify_against_edges(point.x, point.y,
+                                                                                          polygon.edges)
@@ -0,0 +1,35 @@
+import pytest
+
+from benchmark import generate_convex_polygon
+from point_in_polygon import Geometry, Point, PointArray, Polygon
+
+
+# Points where the convex fast path once disagreed with the edge scan: a point exactly the tolerance
+# away from an edge of a clockwise polygon, and a point level with a vertex
+REGRESSIONS = [
+    (PointArray([0, 100, 100, 0], [100, 28.061854646744074, 0, 0]), (76.14873512456539, 45.22001224154749)),
+    (generate_convex_polygon(4, seed=1), (-2.865981925597605, 89.95435591233323)),
+]
+
+
+@pytest.mark.parametrize("vertices, point", REGRESSIONS)
+def test_convex_path_matches_edge_scan(vertices, point):
+    polygon = Polygon(vertices)
+    assert polygon.convex
+    x, y = point
+    expected = Polygon.classify_against_edges(x, y, polygon.edges)
+    assert polygon.classify_convex(x, y) == expected
+    assert polygon.point_in_polygon(Point(x, y)) == expected
+    assert Geometry.CATEGORIES[polygon.classify_many([x], [y])[0]] == expected
+
+
+def test_nearly_collinear_ring_takes_edge_scan():
+    # Three vertices within rounding of a line do not make a convex polygon
+    polygon = Polygon(PointArray([0, 1, 2, 1], [0, 1e-12, 0, 1]))
+    assert not polygon.convex
+
+
+def test_reversed_ring_is_convex():
+    vertices = generate_convex_polygon(12, seed=3)
+    assert Polygon(vertices).convex
+    assert Polygon(PointArray(vertices.xs[::-1], vertices.ys[::-1])).convex
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+import point_in_polygon
+from point_in_polygon import ClassifiedPoints, Point, PointArray, Polygon
+
+
+def lattice_points(seed=0):
+    # Every point of a half-unit lattice, so many points fall on the edges and vertices of a polygon
+    # with integer vertices, plus random points
+    rng = random.Random(seed)
+    xs = [x / 2 for x in range(-2, 23) for y in range(-2, 23)]
+    ys = [y / 2 for x in range(-2, 23) for y in range(-2, 23)]
+    xs += [rng.uniform(-1, 11) for _ in range(500)]
+    ys += [rng.uniform(-1, 11) for _ in range(500)]
+    return xs, ys
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("backend", ["numpy", "pure"])
+def test_edits_match_full_reclassification(monkeypatch, backend, seed):
+    if backend == "numpy" and point_in_polygon.numpy() is None:
+        pytest.skip("NumPy is not installed")
+    if backend == "pure":
+        monkeypatch.setattr(point_in_polygon, "np", None)
+    rng = random.Random(seed)
+    polygon = Polygon(PointArray([1, 2, 5, 8, 9, 9, 6, 5, 3, 1], [1, 5, 9, 8, 4, 1, 2, 0, 3, 0]))
+    xs, ys = lattice_points(seed)
+    stored = ClassifiedPoints(polygon, xs, ys)
+
+    for _ in range(40):
+        n = len(polygon.points)
+        index = rng.randrange(n)
+        point = Point(rng.randrange(11), rng.randrange(11))
+        edit = rng.choice(["move", "insert", "delete"] if n > 4 else ["move", "insert"])
+        if edit == "move":
+            bounds = polygon.edit_bounds((index - 1, index, index + 1), [point])
+            touched = stored.move_vertex(index, point)
+        elif edit == "insert":
+            bounds = polygon.edit_bounds((index - 1, index), [point])
+            touched = stored.insert_vertex(index, point)
+        else:
+            bounds = polygon.edit_bounds((index - 1, index, index + 1), [])
+            touched = stored.delete_vertex(index)
+
+        # Only the points in the edit's box were reclassified, and every stored category is current
+        assert touched == len(stored.points_in(bounds)) < len(xs)
+        assert stored.categories() == [polygon.point_in_polygon(Point(x, y)) for x, y in zip(xs, ys)]
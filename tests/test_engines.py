@@ -0,0 +1,196 @@
+import functools
+import math
+import random
+
+import pytest
+
+import point_in_polygon
+from benchmark import generate_concave_polygon, generate_convex_polygon, generate_star_polygon
+from point_in_polygon import (ClassificationMemo, Geometry, Point, PointArray, Polygon, PolygonGrid, ShapeSet,
+                              coordinates_of)
+
+SEED = 0
+TOL = Geometry.TOLERANCE
+# Offsets that move the check points onto, just inside and just outside the tolerance band
+OFFSETS = (0.0, 0.5 * TOL, -0.5 * TOL, TOL, -TOL, 2 * TOL, -2 * TOL)
+
+
+def generate_flat_arc_polygon(vertex_count, seed=0):
+    # Convex polygon whose vertices lie on a nearly flat arc (1e-6 rad of a large circle) closed by an
+    # apex below it, so every turn along the arc is far below the tolerance
+    rng = random.Random(seed)
+    radius = 10 ** rng.uniform(2, 4)
+    span = 1e-6
+    start = rng.uniform(-span, 0)
+    angles = [start + span * i / (vertex_count - 1) for i in range(vertex_count)]
+    xs = [radius * math.sin(angle) for angle in angles] + [0.0]
+    ys = [radius * math.cos(angle) - radius for angle in angles] + [-rng.uniform(0.1, 2)]
+    # Clockwise, starting part way along the arc
+    shift = rng.randrange(len(xs))
+    xs, ys = xs[::-1], ys[::-1]
+    return PointArray(xs[shift:] + xs[:shift], ys[shift:] + ys[:shift])
+
+
+def generate_polygon_with_hole(vertex_count, seed=0):
+    # Star polygon with a smaller star hole around its centre
+    hole = generate_star_polygon(max(vertex_count // 4, 3), seed + 1)
+    return Polygon(generate_star_polygon(vertex_count, seed),
+                   [PointArray([x / 4 for x in hole.xs], [y / 4 for y in hole.ys])])
+
+
+def reversed_polygon(vertices):
+    # Polygon over the same vertices in the opposite order
+    return Polygon(PointArray(vertices.xs[::-1], vertices.ys[::-1]))
+
+
+POLYGONS = {
+    "convex": lambda: Polygon(generate_convex_polygon(40, SEED)),
+    "convex_clockwise": lambda: reversed_polygon(generate_convex_polygon(40, SEED)),
+    "convex_quad": lambda: Polygon(generate_convex_polygon(4, SEED + 1)),
+    "convex_far": lambda: Polygon(PointArray([x * 1e3 + 1e6 for x in generate_convex_polygon(30, SEED).xs],
+                                             [y * 1e3 + 1e6 for y in generate_convex_polygon(30, SEED).ys])),
+    "concave": lambda: Polygon(generate_concave_polygon(30, SEED)),
+    "star": lambda: Polygon(generate_star_polygon(200, SEED)),
+    "hole": lambda: generate_polygon_with_hole(100, SEED),
+}
+for i in range(5):
+    POLYGONS[f"flat_arc_{i}"] = functools.partial(lambda seed: Polygon(generate_flat_arc_polygon(44, seed)), SEED + i)
+
+
+def scan(polygon, xs, ys):
+    # The oracle: the Ray-Casting Algorithm over every edge, as the code before the fast paths did it
+    return [Polygon.classify_against_edges(x, y, polygon.edges) for x, y in zip(xs, ys)]
+
+
+@functools.lru_cache(maxsize=None)
+def check_points(name, count=500):
+    # Vertices, points on the edges and random points of a polygon, moved by fractions and multiples
+    # of the tolerance, and the scan's answers for them
+    polygon = POLYGONS[name]()
+    rng = random.Random(SEED)
+    xs, ys = [], []
+    for ring in polygon.rings():
+        ring_xs, ring_ys = coordinates_of(ring)
+        for x, y in zip(ring_xs, ring_ys):
+            for offset in OFFSETS:
+                xs += [x + offset, x, x + offset]
+                ys += [y, y + offset, y - offset]
+    for _ in range(count):
+        x1, y1, x2, y2 = polygon.edges[rng.randrange(len(polygon.edges))][:4]
+        t = rng.random()
+        length = math.hypot(x2 - x1, y2 - y1) or 1.0
+        # Move the point across the edge, along its normal
+        offset = rng.choice(OFFSETS)
+        xs.append(x1 + t * (x2 - x1) - offset * (y2 - y1) / length)
+        ys.append(y1 + t * (y2 - y1) + offset * (x2 - x1) / length)
+    min_x, min_y, max_x, max_y = polygon.bounds
+    for _ in range(count):
+        xs.append(rng.uniform(min_x, max_x))
+        ys.append(rng.uniform(min_y, max_y))
+    return xs, ys, scan(polygon, xs, ys)
+
+
+def categories(codes):
+    return [Geometry.CATEGORIES[code] for code in codes]
+
+
+def point_by_point(classify, xs, ys):
+    return [classify(Point(x, y)) for x, y in zip(xs, ys)]
+
+
+def indexed(polygon):
+    polygon = Polygon(polygon.points, polygon.holes)
+    polygon.build_index()
+    return polygon
+
+
+def convex_only(polygon):
+    if not polygon.convex:
+        pytest.skip("not convex")
+    return polygon
+
+
+def shape_set(polygon, xs, ys):
+    shapes = ShapeSet()
+    shapes.add("polygon", polygon)
+    return shapes.classify_many(xs, ys)[0]
+
+
+def convex(polygon, xs, ys):
+    polygon = convex_only(polygon)
+    return [polygon.classify_convex(x, y) for x, y in zip(xs, ys)]
+
+
+ENGINES = {
+    "point_in_polygon": lambda polygon, xs, ys: point_by_point(polygon.point_in_polygon, xs, ys),
+    "classify_many": lambda polygon, xs, ys: categories(polygon.classify_many(xs, ys)),
+    "slab": lambda polygon, xs, ys: point_by_point(indexed(polygon).point_in_polygon, xs, ys),
+    "slab_many": lambda polygon, xs, ys: categories(indexed(polygon).classify_many(xs, ys)),
+    "convex": convex,
+    "sweep": lambda polygon, xs, ys: categories(polygon.classify_sweep(xs, ys)),
+    "grid": lambda polygon, xs, ys: point_by_point(PolygonGrid(polygon, 64, 64).classify, xs, ys),
+    "grid_many": lambda polygon, xs, ys: categories(PolygonGrid(polygon, 64, 64).classify_many(xs, ys)),
+    # quantum=0 keys the memo by the exact coordinates, so it must never change an answer
+    "memo": lambda polygon, xs, ys: categories(ClassificationMemo(polygon, quantum=0, curve="hilbert")
+                                               .classify_many(xs, ys)),
+    "shape_set": lambda polygon, xs, ys: categories(shape_set(polygon, xs, ys)),
+}
+
+# NumPy-only engines
+NUMPY_ENGINES = {
+    "convex_many": lambda polygon, xs, ys: categories(convex_only(polygon).classify_convex_many(
+        point_in_polygon.numpy().array(xs), point_in_polygon.numpy().array(ys))),
+}
+
+
+@pytest.fixture(params=["numpy", "pure"])
+def backend(request, monkeypatch):
+    # Run each engine with NumPy (when installed) and with the pure-Python fallbacks
+    if request.param == "numpy" and point_in_polygon.numpy() is None:
+        pytest.skip("NumPy is not installed")
+    if request.param == "pure":
+        monkeypatch.setattr(point_in_polygon, "np", None)
+    return request.param
+
+
+def mismatches(xs, ys, expected, found):
+    return [(x, y, want, got) for x, y, want, got in zip(xs, ys, expected, found) if want != got][:5]
+
+
+@pytest.mark.parametrize("engine", sorted(ENGINES))
+@pytest.mark.parametrize("name", sorted(POLYGONS))
+def test_engine_matches_scan(name, engine, backend):
+    xs, ys, expected = check_points(name)
+    polygon = POLYGONS[name]()
+    assert mismatches(xs, ys, expected, ENGINES[engine](polygon, xs, ys)) == []
+
+
+@pytest.mark.parametrize("engine", sorted(NUMPY_ENGINES))
+@pytest.mark.parametrize("name", sorted(POLYGONS))
+def test_numpy_engine_matches_scan(name, engine):
+    if point_in_polygon.numpy() is None:
+        pytest.skip("NumPy is not installed")
+    xs, ys, expected = check_points(name)
+    polygon = POLYGONS[name]()
+    assert mismatches(xs, ys, expected, NUMPY_ENGINES[engine](polygon, xs, ys)) == []
+
+
+@pytest.mark.parametrize("name", sorted(POLYGONS))
+def test_rasterize_matches_scan(name, backend):
+    # Compare the cell centres of the whole MBR and of tiny windows around some vertices, whose
+    # cells are a fraction of the tolerance wide
+    polygon = POLYGONS[name]()
+    rng = random.Random(SEED)
+    ring_xs, ring_ys = coordinates_of(polygon.points)
+    windows = [(polygon.bounds, (64, 64))]
+    for _ in range(10):
+        i = rng.randrange(len(ring_xs))
+        x, y = ring_xs[i], ring_ys[i]
+        windows.append(((x - 2 * TOL, y - 2 * TOL, x + 2 * TOL, y + 2 * TOL), (9, 9)))
+    for bounds, resolution in windows:
+        codes = polygon.rasterize(bounds, resolution)
+        flat = codes.ravel().tolist() if hasattr(codes, 'ravel') else list(codes)
+        axis_xs, axis_ys = polygon.raster_axes(bounds, *resolution)
+        xs = [x for y in axis_ys for x in axis_xs]
+        ys = [y for y in axis_ys for x in axis_xs]
+        assert mismatches(xs, ys, scan(polygon, xs, ys), categories(flat)) == []
@@ -0,0 +1,108 @@
+import random
+
+import pytest
+
+import point_in_polygon
+from benchmark import generate_star_polygon
+from point_in_polygon import (Geometry, Point, PointArray, Polygon, PolygonLayer, read_polygons_from_file,
+                              write_locations_to_file)
+
+
+def generate_layer_polygons(seed=0):
+    # A 6 x 6 tiling of unit squares sharing edges and vertices, plus small stars overlapping them
+    rng = random.Random(seed)
+    polygons = []
+    for row in range(6):
+        for column in range(6):
+            polygons.append(Polygon(PointArray([column, column, column + 1, column + 1],
+                                               [row, row + 1, row + 1, row])))
+    for star_seed in range(10):
+        star = generate_star_polygon(12, seed=star_seed)
+        scale, dx, dy = rng.uniform(0.005, 0.02), rng.uniform(0, 6), rng.uniform(0, 6)
+        polygons.append(Polygon(PointArray([x * scale + dx for x in star.xs], [y * scale + dy for y in star.ys])))
+    return polygons
+
+
+def generate_layer_points(polygons, count=1000, seed=0):
+    # The vertices of every polygon, points on the shared grid lines and random points around the layer
+    rng = random.Random(seed)
+    xs, ys = [], []
+    for polygon in polygons:
+        xs += polygon.points.xs.tolist()
+        ys += polygon.points.ys.tolist()
+    for _ in range(count):
+        xs += [rng.randrange(7), rng.uniform(-1, 7)]
+        ys += [rng.uniform(-1, 7), rng.randrange(7)]
+        xs.append(rng.uniform(-1, 7))
+        ys.append(rng.uniform(-1, 7))
+    return xs, ys
+
+
+def brute_force(polygons, ids, x, y):
+    # Scan every polygon: the first one with the point inside wins, then the first with it on its boundary
+    boundary_id = None
+    for polygon_id, polygon in zip(ids, polygons):
+        classification = Polygon.classify_against_edges(x, y, polygon.edges)
+        if classification == "inside":
+            return polygon_id, "inside"
+        if classification == "boundary" and boundary_id is None:
+            boundary_id = polygon_id
+    return (boundary_id, "boundary") if boundary_id is not None else (None, "outside")
+
+
+@pytest.mark.parametrize("node_capacity", [2, 4, None])
+def test_layer_matches_brute_force(node_capacity):
+    polygons = generate_layer_polygons()
+    ids = [f"zone{index}" for index in range(len(polygons))]
+    layer = PolygonLayer(polygons, ids, node_capacity=node_capacity)
+    xs, ys = generate_layer_points(polygons)
+    expected = [brute_force(polygons, ids, x, y) for x, y in zip(xs, ys)]
+
+    assert [layer.locate(Point(x, y)) for x, y in zip(xs, ys)] == expected
+    for x, y in zip(xs[:500], ys[:500]):
+        boxes = [index for index, (min_x, min_y, max_x, max_y) in enumerate(layer.boxes)
+                 if min_x <= x <= max_x and min_y <= y <= max_y]
+        assert layer.candidates(x, y) == boxes
+
+    polygon_ids, codes = layer.locate_many(xs, ys)
+    assert list(zip(polygon_ids, [Geometry.CATEGORIES[code] for code in codes])) == expected
+
+
+def test_layer_without_numpy(monkeypatch):
+    monkeypatch.setattr(point_in_polygon, "np", None)
+    polygons = generate_layer_polygons(seed=1)
+    layer = PolygonLayer(polygons)
+    xs, ys = generate_layer_points(polygons, count=200, seed=1)
+    polygon_ids, codes = layer.locate_many(xs, ys)
+    expected = [brute_force(polygons, layer.ids, x, y) for x, y in zip(xs, ys)]
+    assert list(zip(polygon_ids, [Geometry.CATEGORIES[code] for code in codes])) == expected
+
+
+def test_empty_layer():
+    layer = PolygonLayer([])
+    assert layer.locate(Point(0, 0)) == (None, "outside")
+
+
+def test_polygon_file_round_trip(tmp_path):
+    # Write a polygon_id,x,y file, read it back as a layer and write the located points
+    polygons = generate_layer_polygons()[::7]
+    ids = [f"zone{index}" for index in range(len(polygons))]
+    lines = ["polygon_id,x,y"]
+    for polygon_id, polygon in zip(ids, polygons):
+        lines += [f"{polygon_id},{x!r},{y!r}" for x, y in zip(polygon.points.xs, polygon.points.ys)]
+    (tmp_path / "zones.csv").write_text("\n".join(lines) + "\n")
+
+    read_ids, read_polygons = read_polygons_from_file(str(tmp_path / "zones.csv"))
+    assert read_ids == ids
+    assert [polygon.edges for polygon in read_polygons] == [polygon.edges for polygon in polygons]
+
+    layer = PolygonLayer(read_polygons, read_ids)
+    xs, ys = generate_layer_points(polygons, count=50)
+    locations = [layer.locate(Point(x, y)) for x, y in zip(xs, ys)]
+    write_locations_to_file(str(tmp_path / "locations.csv"), [polygon_id for polygon_id, _ in locations],
+                            [category for _, category in locations])
+    rows = (tmp_path / "locations.csv").read_text().splitlines()
+    assert rows[0] == "id,polygon_id,category"
+    assert rows[1:] == [f"{id},{'' if polygon_id is None else polygon_id},{category}"
+                        for id, (polygon_id, category) in enumerate(locations, start=1)]
+    assert {category for _, category in locations} == {"inside", "boundary", "outside"}
@@ -0,0 +1,72 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from point_in_polygon import (Polygon, PointArray, ShapeSet, classify_binary_file, classify_file, convert_binary_to_csv,
+                              convert_csv_to_binary, is_binary_file)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUTS = ["output.csv", "output_triangle.csv", "output_square.csv"]
+
+
+def run_main(directory, *args):
+    # Run main_from_file.py in directory on the repository's polygon.csv
+    shutil.copy(os.path.join(ROOT, "polygon.csv"), directory)
+    result = subprocess.run([sys.executable, os.path.join(ROOT, "main_from_file.py"), *args], cwd=directory,
+                            capture_output=True, text=True, check=True)
+    return result.stdout
+
+
+def write_earlier_outputs(directory):
+    for name in OUTPUTS:
+        (directory / name).write_text("id,category\n1,inside\n")
+
+
+@pytest.mark.parametrize("points", [None, "id,x,y\n"])
+def test_empty_points_keep_earlier_outputs(tmp_path, points):
+    # A missing or empty points file must not truncate the results of an earlier run
+    write_earlier_outputs(tmp_path)
+    if points is not None:
+        (tmp_path / "input.csv").write_text(points)
+    assert "Error: Empty test points." in run_main(tmp_path)
+    for name in OUTPUTS:
+        assert (tmp_path / name).read_text() == "id,category\n1,inside\n"
+
+
+def test_empty_points_create_no_outputs(tmp_path):
+    (tmp_path / "input.csv").write_text("id,x,y\n")
+    polygon = Polygon(PointArray([0, 0, 1, 1], [0, 1, 1, 0]))
+    shapes = ShapeSet()
+    shapes.add("polygon", polygon)
+    assert shapes.classify_file(str(tmp_path / "input.csv"), {"polygon": str(tmp_path / "shapes.csv")},
+                                wide_filename=str(tmp_path / "wide.csv")) == 0
+    assert classify_file(polygon, str(tmp_path / "input.csv"), str(tmp_path / "polygon.csv")) == 0
+    assert classify_binary_file(polygon, str(tmp_path / "missing.bin"), str(tmp_path / "codes.bin")) == 0
+    assert sorted(os.listdir(tmp_path)) == ["input.csv"]
+
+
+def test_points_are_written(tmp_path):
+    (tmp_path / "input.csv").write_text("id,x,y\n1,0,0\n2,1000,1000\n")
+    run_main(tmp_path)
+    for name in OUTPUTS:
+        assert (tmp_path / name).read_text().count("\n") == 3
+
+
+@pytest.mark.parametrize("plot", [False, True])
+def test_binary_points_and_results(tmp_path, plot):
+    # A binary points file gives the same categories as the CSV it was converted from, written as
+    # binary category files with --format binary
+    (tmp_path / "input.csv").write_text("id,x,y\n1,0,0\n2,1000,1000\n3,2.5,3.5\n")
+    args = ["--save-plots", str(tmp_path)] if plot else []
+    run_main(tmp_path, *args)
+    expected = {name: (tmp_path / name).read_text() for name in OUTPUTS}
+    convert_csv_to_binary(str(tmp_path / "input.csv"), str(tmp_path / "input.bin"))
+    assert "Error" not in run_main(tmp_path, "--points", "input.bin", "--format", "binary", *args)
+    for name in OUTPUTS:
+        binary_name = name.replace(".csv", ".bin")
+        assert is_binary_file(str(tmp_path / binary_name))
+        convert_binary_to_csv(str(tmp_path / binary_name), str(tmp_path / "converted.csv"))
+        assert (tmp_path / "converted.csv").read_text() == expected[name]
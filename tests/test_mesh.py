@@ -0,0 +1,79 @@
+import random
+
+import pytest
+
+import point_in_polygon
+from benchmark import generate_triangle_mesh
+from point_in_polygon import Point, Triangle, TriangleMesh
+
+
+def mesh_points(xs, ys, triangles, count=300, seed=0):
+    # The shared vertices, points along the shared edges and random points around the mesh
+    rng = random.Random(seed)
+    points = [Point(x, y) for x, y in zip(xs, ys)]
+    for i, j, k in triangles:
+        for a, b in ((i, j), (j, k), (k, i)):
+            for t in (0.5, rng.random()):
+                points.append(Point(xs[a] + t * (xs[b] - xs[a]), ys[a] + t * (ys[b] - ys[a])))
+    for _ in range(count):
+        points.append(Point(rng.uniform(min(xs) - 1, max(xs) + 1), rng.uniform(min(ys) - 1, max(ys) + 1)))
+    return points
+
+
+def first_triangle(triangles, point):
+    # Test the triangles one by one: the first one with the point inside or on its boundary
+    for index, triangle in enumerate(triangles):
+        if triangle.point_in_triangle(point) != "outside":
+            return index
+    return -1
+
+
+def weights_of(triangle, point):
+    # Barycentric weights as Triangle.point_in_triangle computes them
+    (x1, y1), (x2, y2), (x3, y3) = [(vertex.x, vertex.y) for vertex in triangle.vertices]
+    det = (y2 - y3) * (x1 - x3) + (x3 - x2) * (y1 - y3)
+    alpha = ((y2 - y3) * (point.x - x3) + (x3 - x2) * (point.y - y3)) / det
+    beta = ((y3 - y1) * (point.x - x3) + (x1 - x3) * (point.y - y3)) / det
+    return alpha, beta, 1 - alpha - beta
+
+
+@pytest.mark.parametrize("seed", range(3))
+@pytest.mark.parametrize("backend", ["numpy", "pure"])
+def test_mesh_matches_point_in_triangle(monkeypatch, backend, seed):
+    if backend == "numpy" and point_in_polygon.numpy() is None:
+        pytest.skip("NumPy is not installed")
+    if backend == "pure":
+        monkeypatch.setattr(point_in_polygon, "np", None)
+    xs, ys, vertex_ids = generate_triangle_mesh(64, seed)
+    mesh = TriangleMesh(xs, ys, vertex_ids)
+    triangles = [Triangle([Point(xs[i], ys[i]) for i in vertices]) for vertices in vertex_ids]
+    points = mesh_points(xs, ys, vertex_ids, seed=seed)
+    expected = [first_triangle(triangles, point) for point in points]
+
+    located = [mesh.locate(point) for point in points]
+    assert [index for index, _ in located] == expected
+    for point, (index, weights) in zip(points, located):
+        if index >= 0:
+            assert weights == pytest.approx(weights_of(triangles[index], point), abs=1e-9)
+
+    indices, many_weights = mesh.locate_many([point.x for point in points], [point.y for point in points])
+    assert list(indices) == expected
+    for (index, weights), found in zip(located, many_weights):
+        if index >= 0:
+            assert tuple(found) == pytest.approx(weights, abs=1e-12)
+
+
+def test_from_triangles():
+    # Separate triangles touching at a vertex and along an edge
+    triangles = [Triangle([Point(0, 0), Point(2, 0), Point(0, 2)]),
+                 Triangle([Point(2, 0), Point(2, 2), Point(0, 2)]),
+                 Triangle([Point(2, 2), Point(4, 2), Point(4, 4)])]
+    mesh = TriangleMesh.from_triangles(triangles)
+    for point in [Point(0, 0), Point(1, 1), Point(2, 0), Point(2, 2), Point(3, 3), Point(1.5, 1.5), Point(3, 1),
+                  Point(5, 5), Point(0.5, 0.5)]:
+        assert mesh.locate(point)[0] == first_triangle(triangles, point)
+
+
+def test_empty_mesh():
+    with pytest.raises(ValueError):
+        TriangleMesh([], [], [])